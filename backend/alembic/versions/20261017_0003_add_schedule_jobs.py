@@ -0,0 +1,57 @@
+"""Add schedule_jobs table for background generation
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 00:03:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "schedule_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("days", sa.Integer(), nullable=False),
+        sa.Column("chunk_days", sa.Integer(), nullable=False),
+        sa.Column("workers", sa.Integer(), nullable=True),
+        sa.Column("partition_by", sa.String(), nullable=True),
+        sa.Column("days_done", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("stores_done", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("assignments", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "cancel_requested", sa.Boolean(), nullable=False, server_default=sa.text("0")
+        ),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_schedule_jobs_id"), "schedule_jobs", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_schedule_jobs_status"), "schedule_jobs", ["status"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_schedule_jobs_status"), table_name="schedule_jobs")
+    op.drop_index(op.f("ix_schedule_jobs_id"), table_name="schedule_jobs")
+    op.drop_table("schedule_jobs")
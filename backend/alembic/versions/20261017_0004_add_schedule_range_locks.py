@@ -0,0 +1,31 @@
+"""Add schedule_range_locks table for concurrent generation
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 00:04:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "schedule_range_locks",
+        sa.Column("lock_date", sa.Date(), nullable=False),
+        sa.Column("acquired_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("lock_date"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("schedule_range_locks")
@@ -0,0 +1,62 @@
+"""Add rider_absences table and migrate observation keywords
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 00:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EXCEPTION_KEYWORDS = ["VACACIONES", "INCAPACIDAD", "LICENCIA", "PERMISO"]
+
+
+def upgrade() -> None:
+    absences = op.create_table(
+        "rider_absences",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("rider_id", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=True),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("reason", sa.String(), nullable=False),
+        sa.Column("notes", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["rider_id"], ["riders.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_rider_absences_id"), "rider_absences", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_rider_absences_rider_id"), "rider_absences", ["rider_id"], unique=False
+    )
+
+    # Free-text observations marked the rider absent on every date; keep
+    # that meaning with open-ended periods
+    riders = sa.table(
+        "riders", sa.column("id", sa.Integer), sa.column("observation", sa.String)
+    )
+    rows = []
+    for rider_id, observation in op.get_bind().execute(
+        sa.select(riders.c.id, riders.c.observation).where(
+            riders.c.observation.isnot(None)
+        )
+    ):
+        text = observation.upper()
+        reason = next((k for k in EXCEPTION_KEYWORDS if k in text), None)
+        if reason is not None:
+            rows.append({"rider_id": rider_id, "reason": reason, "notes": observation})
+    if rows:
+        op.bulk_insert(absences, rows)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_rider_absences_rider_id"), table_name="rider_absences")
+    op.drop_index(op.f("ix_rider_absences_id"), table_name="rider_absences")
+    op.drop_table("rider_absences")
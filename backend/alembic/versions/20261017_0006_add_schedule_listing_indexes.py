@@ -0,0 +1,34 @@
+"""Add composite indexes for filtered schedule listings
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:06:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_schedule_assignments_store_date", ["store_id", "shift_date"]),
+    ("ix_schedule_assignments_rider_date", ["rider_id", "shift_date"]),
+    ("ix_schedule_assignments_brand_date", ["external_brand_id", "shift_date"]),
+    ("ix_schedule_assignments_manual_date", ["manual_override", "shift_date"]),
+]
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES:
+        op.create_index(name, "schedule_assignments", columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="schedule_assignments")
@@ -0,0 +1,56 @@
+"""Mark rider absences derived from the observation
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:07:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("rider_absences") as batch_op:
+        batch_op.add_column(
+            sa.Column("source", sa.String(), nullable=False, server_default="MANUAL")
+        )
+
+    # Migration 005 and the observation sync wrote open-ended periods whose
+    # notes are the rider's observation; those are the derived ones
+    absences = sa.table(
+        "rider_absences",
+        sa.column("rider_id", sa.Integer),
+        sa.column("start_date", sa.Date),
+        sa.column("end_date", sa.Date),
+        sa.column("notes", sa.String),
+        sa.column("source", sa.String),
+    )
+    riders = sa.table(
+        "riders", sa.column("id", sa.Integer), sa.column("observation", sa.String)
+    )
+    op.execute(
+        absences.update()
+        .where(
+            absences.c.start_date.is_(None),
+            absences.c.end_date.is_(None),
+            absences.c.notes
+            == sa.select(riders.c.observation)
+            .where(riders.c.id == absences.c.rider_id)
+            .scalar_subquery(),
+        )
+        .values(source="OBSERVATION")
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("rider_absences") as batch_op:
+        batch_op.drop_column("source")
@@ -3,6 +3,7 @@ from .riders import router as riders_router
 from .brands import router as brands_router
 from .schedules import router as schedules_router
 from .imports import router as imports_router
+from .admin import router as admin_router
 
 __all__ = [
     "stores_router",
@@ -10,4 +11,5 @@ __all__ = [
     "brands_router",
     "schedules_router",
     "imports_router",
+    "admin_router",
 ]
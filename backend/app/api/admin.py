@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List
+from app.schemas import schemas
+from app.services.reference import reference_cache
+from app.services.tracing import trace_store
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/traces", response_model=List[schemas.Trace])
+def list_traces(limit: int = Query(50, ge=1, le=500)):
+    """Phase timings of the most recent schedule runs, newest first"""
+    return [trace.as_dict() for trace in trace_store.recent(limit)]
+
+
+@router.get("/traces/{trace_id}", response_model=schemas.Trace)
+def get_trace(trace_id: int):
+    """One recorded run, by the id returned in ``X-Schedule-Trace``"""
+    recorded = trace_store.get(trace_id)
+    if recorded is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return recorded.as_dict()
+
+
+@router.delete("/traces", status_code=204)
+def clear_traces():
+    trace_store.clear()
+
+
+@router.get("/reference-cache", response_model=List[schemas.ReferenceCacheStats])
+def reference_cache_stats():
+    """Hits and misses of the rider, store and brand cache per table"""
+    return reference_cache.stats()
+
+
+@router.delete("/reference-cache", status_code=204)
+def clear_reference_cache():
+    reference_cache.clear()
@@ -1,23 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
+from app.api.conditional import conditional_json
 from app.database import get_db
 from app.schemas import schemas
 from app.services import services
-from app.models.models import ExternalBrand
+from app.services.reference import reference_cache
+from app.services.versions import versions
 
 router = APIRouter(prefix="/brands", tags=["brands"])
 
+_brands = TypeAdapter(List[schemas.ExternalBrand])
+
 
 @router.get("/", response_model=List[schemas.ExternalBrand])
-def list_brands(db: Session = Depends(get_db)):
-    return services.get_external_brands(db)
+def list_brands(request: Request, db: Session = Depends(get_db)):
+    def build():
+        brands = services.get_external_brands(db)
+        return _brands.dump_json(_brands.validate_python(brands, from_attributes=True)), None
+
+    return conditional_json(request, versions.etag("brands"), ("brands",), build)
 
 
 @router.post("/", response_model=schemas.ExternalBrand, status_code=201)
 def create_brand(brand: schemas.ExternalBrandCreate, db: Session = Depends(get_db)):
-    existing = db.query(ExternalBrand).filter(ExternalBrand.name == brand.name).first()
-    if existing:
+    if brand.name in reference_cache.brands(db).by_name:
         raise HTTPException(status_code=400, detail="Brand already exists")
     return services.create_external_brand(db, brand)
 
@@ -27,12 +35,8 @@ def update_brand(
     brand_id: int, brand: schemas.ExternalBrandUpdate, db: Session = Depends(get_db)
 ):
     if brand.name:
-        existing = (
-            db.query(ExternalBrand)
-            .filter(ExternalBrand.name == brand.name, ExternalBrand.id != brand_id)
-            .first()
-        )
-        if existing:
+        existing = reference_cache.brands(db).by_name.get(brand.name)
+        if existing and existing.id != brand_id:
             raise HTTPException(status_code=400, detail="Brand already exists")
     db_brand = services.update_external_brand(db, brand_id, brand)
     if db_brand is None:
@@ -0,0 +1,35 @@
+from fastapi import Request, Response
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app.services.versions import response_cache
+import json
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+def encode(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def conditional_json(
+    request: Request,
+    etag: str,
+    key: Hashable,
+    build: Callable[[], Tuple[bytes, Optional[Dict[str, str]]]],
+) -> Response:
+    """Answer from ``If-None-Match`` (304), the body cache, or ``build`` on a miss"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    entry = response_cache.get((key, etag))
+    if entry is None:
+        body, extra = build()
+        entry = (body, extra or {})
+        response_cache.put((key, etag), body, extra)
+    body, extra = entry
+    return Response(body, media_type="application/json", headers={**extra, **headers})
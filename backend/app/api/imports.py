@@ -3,6 +3,10 @@ from sqlalchemy.orm import Session
 from typing import Any
 from app.database import get_db
 from app.models.models import Rider, PanpayaStore, ExternalBrand
+from app.services.invalidation import invalidations
+from app.services.reference import reference_cache
+from app.services.services import sync_observation_absence
+from app.services.versions import versions
 from openpyxl import load_workbook
 
 router = APIRouter(prefix="/imports", tags=["imports"])
@@ -33,6 +37,7 @@ def import_riders(file: UploadFile = File(...), db: Session = Depends(get_db)):
     store_index = headers.index("SUCURSAL") if "SUCURSAL" in headers else None
     id_index = headers.index("CC") if "CC" in headers else None
     obs_index = headers.index("OBSERVACION") if "OBSERVACION" in headers else None
+    stores_by_code = reference_cache.stores(db).by_code
     created = 0
     updated = 0
     for row in sheet.iter_rows(min_row=2, values_only=True):
@@ -45,9 +50,7 @@ def import_riders(file: UploadFile = File(...), db: Session = Depends(get_db)):
         )
         if not full_name or not rider_type:
             continue
-        store = None
-        if store_code:
-            store = db.query(PanpayaStore).filter(PanpayaStore.code == store_code).first()
+        store = stores_by_code.get(store_code) if store_code else None
         existing = db.query(Rider).filter(Rider.full_name == full_name).first()
         payload = {
             "full_name": full_name,
@@ -62,9 +65,14 @@ def import_riders(file: UploadFile = File(...), db: Session = Depends(get_db)):
                 setattr(existing, key, value)
             updated += 1
         else:
-            db.add(Rider(**payload))
+            existing = Rider(**payload)
+            db.add(existing)
+            db.flush()
             created += 1
+        sync_observation_absence(db, existing)
     db.commit()
+    invalidations.everything(reference_cache.stores(db).by_id)
+    versions.bump("riders")
     return {"created": created, "updated": updated}
 
 
@@ -107,6 +115,7 @@ def import_stores(file: UploadFile = File(...), db: Session = Depends(get_db)):
             db.add(PanpayaStore(**payload))
             created += 1
     db.commit()
+    versions.bump("stores")
     return {"created": created, "updated": updated}
 
 
@@ -122,17 +131,21 @@ def import_brands(file: UploadFile = File(...), db: Session = Depends(get_db)):
     if "MARCA" not in headers:
         raise HTTPException(status_code=400, detail="Missing column MARCA")
     brand_index = headers.index("MARCA")
+    # Names added by earlier rows count too, so a repeated name is not inserted twice
+    names = set(reference_cache.brands(db).by_name)
     created = 0
     updated = 0
     for row in sheet.iter_rows(min_row=2, values_only=True):
         name = str(row[brand_index]).strip() if row[brand_index] else ""
         if not name:
             continue
-        existing = db.query(ExternalBrand).filter(ExternalBrand.name == name).first()
-        if existing:
+        if name in names:
             updated += 1
             continue
         db.add(ExternalBrand(name=name))
+        names.add(name)
         created += 1
     db.commit()
+    invalidations.external()
+    versions.bump("brands")
     return {"created": created, "updated": updated}
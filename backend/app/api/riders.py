@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
+from app.api.conditional import conditional_json
 from app.database import get_db
 from app.schemas import schemas
 from app.services import services
+from app.services.reference import reference_cache
+from app.services.versions import versions
 
 router = APIRouter(prefix="/riders", tags=["riders"])
 
+_riders = TypeAdapter(List[schemas.Rider])
+
 
 @router.get("/", response_model=List[schemas.Rider])
 def list_riders(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     active_only: bool = Query(False),
     db: Session = Depends(get_db),
 ):
     """List all riders with optional active filter"""
-    return services.get_riders(db, skip=skip, limit=limit, active_only=active_only)
+
+    def build():
+        riders = services.get_riders(db, skip=skip, limit=limit, active_only=active_only)
+        return _riders.dump_json(_riders.validate_python(riders, from_attributes=True)), None
+
+    return conditional_json(
+        request, versions.etag("riders"), ("riders", skip, limit, active_only), build
+    )
 
 
 @router.get("/{rider_id}", response_model=schemas.Rider)
@@ -33,7 +47,7 @@ def create_rider(rider: schemas.RiderCreate, db: Session = Depends(get_db)):
     """Create a new rider"""
     if rider.store_id is not None and rider.store_id <= 0:
         raise HTTPException(status_code=400, detail="Invalid store ID")
-    if rider.store_id is not None and services.get_store(db, rider.store_id) is None:
+    if rider.store_id is not None and reference_cache.store(db, rider.store_id) is None:
         raise HTTPException(status_code=400, detail="Store not found")
     return services.create_rider(db, rider)
 
@@ -45,7 +59,7 @@ def update_rider(
     """Update an existing rider"""
     if rider.store_id is not None and rider.store_id <= 0:
         raise HTTPException(status_code=400, detail="Invalid store ID")
-    if rider.store_id is not None and services.get_store(db, rider.store_id) is None:
+    if rider.store_id is not None and reference_cache.store(db, rider.store_id) is None:
         raise HTTPException(status_code=400, detail="Store not found")
     db_rider = services.update_rider(db, rider_id, rider)
     if db_rider is None:
@@ -59,3 +73,38 @@ def delete_rider(rider_id: int, db: Session = Depends(get_db)):
     success = services.delete_rider(db, rider_id)
     if not success:
         raise HTTPException(status_code=404, detail="Rider not found")
+
+
+@router.get("/{rider_id}/absences", response_model=List[schemas.RiderAbsence])
+def list_rider_absences(rider_id: int, db: Session = Depends(get_db)):
+    """List the absence periods of a rider"""
+    if services.get_rider(db, rider_id) is None:
+        raise HTTPException(status_code=404, detail="Rider not found")
+    return services.get_rider_absences(db, rider_id)
+
+
+@router.post("/{rider_id}/absences", response_model=schemas.RiderAbsence, status_code=201)
+def create_rider_absence(
+    rider_id: int, absence: schemas.RiderAbsenceCreate, db: Session = Depends(get_db)
+):
+    """Register an absence period for a rider"""
+    db_rider = services.get_rider(db, rider_id)
+    if db_rider is None:
+        raise HTTPException(status_code=404, detail="Rider not found")
+    if (
+        absence.start_date is not None
+        and absence.end_date is not None
+        and absence.start_date > absence.end_date
+    ):
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    return services.create_rider_absence(db, db_rider, absence)
+
+
+@router.delete("/{rider_id}/absences/{absence_id}", status_code=204)
+def delete_rider_absence(rider_id: int, absence_id: int, db: Session = Depends(get_db)):
+    """Delete an absence period of a rider"""
+    db_rider = services.get_rider(db, rider_id)
+    if db_rider is None:
+        raise HTTPException(status_code=404, detail="Rider not found")
+    if not services.delete_rider_absence(db, db_rider, absence_id):
+        raise HTTPException(status_code=404, detail="Absence not found")
@@ -1,20 +1,166 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 from datetime import date
+from app.api.conditional import conditional_json, encode
 from app.database import get_db
 from app.schemas import schemas
 from app.services import services
+from app.services.invalidation import invalidations
+from app.services.jobs import job_runner
+from app.services.preview import StalePreviewError
+from app.services.tracing import trace
+from app.services.versions import versions
 from fastapi.responses import StreamingResponse
 from io import BytesIO
 from openpyxl import Workbook
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 
+# NDJSON lines handed to the server per write when streaming the listing
+NDJSON_CHUNK_ROWS = 500
+
+
+def ndjson_chunks(rows: Iterable[dict], chunk_rows: int = NDJSON_CHUNK_ROWS) -> Iterator[bytes]:
+    """Encode rows as NDJSON, ``chunk_rows`` lines per yielded chunk."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+        if len(lines) == chunk_rows:
+            lines.append("")
+            yield "\n".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        lines.append("")
+        yield "\n".join(lines).encode("utf-8")
+
+
+def with_cursor(rows: Iterable[dict], limit: Optional[int]) -> Iterator[dict]:
+    """Pass rows through, then the next cursor when they filled a page"""
+    count = 0
+    last = None
+    for last in rows:
+        count += 1
+        yield last
+    if limit is not None and count == limit:
+        yield {"next_after_date": last["shift_date"], "next_after_id": last["id"]}
+
 
 @router.get("/", response_model=List[schemas.ScheduleAssignmentDetail])
-def list_schedule(start_date: date, end_date: date, db: Session = Depends(get_db)):
-    return services.list_schedule_assignments(db, start_date, end_date)
+def list_schedule(
+    request: Request,
+    start_date: date,
+    end_date: date,
+    store_id: Optional[int] = None,
+    rider_id: Optional[int] = None,
+    external_brand_id: Optional[int] = None,
+    shift_type: Optional[str] = None,
+    zone: Optional[str] = None,
+    manual_override: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size; all rows when omitted"),
+    after_date: Optional[date] = Query(None, description="shift_date of the last row of the previous page"),
+    after_id: Optional[int] = Query(None, description="id of the last row of the previous page"),
+    response_format: str = Query(
+        "json", alias="format", pattern="^(json|ndjson)$", description="ndjson streams one row per line"
+    ),
+    db: Session = Depends(get_db),
+):
+    """List assignments ordered by (shift_date, id), paged by keyset cursor"""
+    if (after_date is None) != (after_id is None):
+        raise HTTPException(
+            status_code=400, detail="after_date and after_id go together"
+        )
+    filters = dict(
+        store_id=store_id,
+        rider_id=rider_id,
+        external_brand_id=external_brand_id,
+        shift_type=shift_type,
+        zone=zone,
+        manual_override=manual_override,
+        after=(after_date, after_id) if after_date is not None else None,
+        limit=limit,
+    )
+    if response_format == "ndjson":
+        # The stream outlives the request-scoped session, so it reads
+        # through its own and closes it once the body is sent
+        stream_db = Session(bind=db.get_bind())
+
+        def body() -> Iterator[bytes]:
+            try:
+                rows = services.iter_schedule_rows(stream_db, start_date, end_date, **filters)
+                yield from ndjson_chunks(with_cursor(rows, limit))
+            finally:
+                stream_db.close()
+
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    def build():
+        rows = services.list_schedule_rows(db, start_date, end_date, **filters)
+        headers = {}
+        if limit is not None and len(rows) == limit:
+            headers["X-Next-After-Date"] = rows[-1]["shift_date"]
+            headers["X-Next-After-Id"] = str(rows[-1]["id"])
+        # The rows already match the response model; skip re-validating them
+        return encode(rows), headers
+
+    return conditional_json(
+        request,
+        versions.schedule_etag(start_date, end_date),
+        ("schedule", start_date, end_date, tuple(sorted(filters.items()))),
+        build,
+    )
+
+
+@router.get("/stats", response_model=schemas.ScheduleStatsResponse)
+def schedule_stats(
+    request: Request,
+    start_date: date,
+    end_date: date,
+    group_by: List[str] = Query(
+        ["rider"], description="Any of rider, store, brand, zone, shift_type, week"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Shift totals grouped in the database, for ranges of any length"""
+    unknown = [name for name in group_by if name not in services.STATS_GROUPS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by: {', '.join(unknown)}")
+    group_by = list(dict.fromkeys(group_by))
+
+    def build():
+        stats = schemas.ScheduleStatsResponse(
+            start_date=start_date,
+            end_date=end_date,
+            group_by=group_by,
+            rows=services.schedule_stats(db, start_date, end_date, group_by),
+        )
+        return stats.model_dump_json().encode("utf-8"), None
+
+    return conditional_json(
+        request,
+        versions.schedule_etag(start_date, end_date),
+        ("stats", start_date, end_date, tuple(group_by)),
+        build,
+    )
+
+
+@router.get("/dashboard", response_model=schemas.ScheduleDashboardResponse)
+def schedule_dashboard(
+    request: Request, start_date: date, end_date: date, db: Session = Depends(get_db)
+):
+    """Assignments of a range with the active riders left unassigned each day"""
+    # Same cap as a horizon; it also keeps the date series of the anti-join
+    # below MySQL's cte_max_recursion_depth (1000 by default)
+    if (end_date - start_date).days >= 366:
+        raise HTTPException(status_code=400, detail="The dashboard covers at most 366 days")
+    return conditional_json(
+        request,
+        versions.schedule_etag(start_date, end_date),
+        ("dashboard", start_date, end_date),
+        lambda: (encode(services.schedule_dashboard(db, start_date, end_date)), None),
+    )
 
 
 @router.post("/", response_model=schemas.ScheduleAssignment, status_code=201)
@@ -45,14 +191,137 @@ def delete_schedule(assignment_id: int, db: Session = Depends(get_db)):
 
 @router.post("/generate", response_model=List[schemas.ScheduleAssignmentDetail])
 def generate_schedule(
+    request: schemas.ScheduleGenerateRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    with trace("generate") as current:
+        assignments = services.generate_schedule(
+            db,
+            request.start_date,
+            request.days,
+            workers=request.workers,
+            partition_by=request.partition_by,
+        )
+    response.headers["Server-Timing"] = current.server_timing()
+    response.headers["X-Schedule-Trace"] = str(current.id)
+    return assignments
+
+
+@router.post("/generate/horizon", response_model=schemas.ScheduleHorizonResponse)
+def generate_schedule_horizon(
+    request: schemas.ScheduleHorizonRequest, db: Session = Depends(get_db)
+):
+    return services.generate_schedule_horizon(
+        db,
+        request.start_date,
+        request.days,
+        chunk_days=request.chunk_days,
+        workers=request.workers,
+        partition_by=request.partition_by,
+    )
+
+
+@router.post("/jobs", response_model=schemas.ScheduleJob, status_code=202)
+def submit_schedule_job(
+    request: schemas.ScheduleHorizonRequest, db: Session = Depends(get_db)
+):
+    return job_runner.submit(
+        db,
+        request.start_date,
+        request.days,
+        chunk_days=request.chunk_days,
+        workers=request.workers,
+        partition_by=request.partition_by,
+    )
+
+
+@router.get("/jobs", response_model=List[schemas.ScheduleJob])
+def list_schedule_jobs(
+    limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)
+):
+    return job_runner.recent(db, limit=limit)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.ScheduleJob)
+def get_schedule_job(job_id: int, db: Session = Depends(get_db)):
+    job = job_runner.get(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=schemas.ScheduleJob)
+def cancel_schedule_job(job_id: int, db: Session = Depends(get_db)):
+    job = job_runner.cancel(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/preview", response_model=schemas.SchedulePreviewResponse)
+def preview_schedule(
     request: schemas.ScheduleGenerateRequest, db: Session = Depends(get_db)
 ):
-    return services.generate_schedule(db, request.start_date, request.days)
+    return services.preview_schedule(
+        db,
+        request.start_date,
+        request.days,
+        workers=request.workers,
+        partition_by=request.partition_by,
+    )
+
+
+@router.post(
+    "/preview/{fingerprint}/commit",
+    response_model=List[schemas.ScheduleAssignmentDetail],
+)
+def commit_preview(fingerprint: str, db: Session = Depends(get_db)):
+    try:
+        committed = services.commit_preview(db, fingerprint)
+    except StalePreviewError:
+        raise HTTPException(
+            status_code=409, detail="Schedule inputs changed since the preview"
+        )
+    if committed is None:
+        raise HTTPException(status_code=404, detail="Preview not found")
+    return committed
+
+
+@router.post("/reconcile", response_model=schemas.ScheduleReconcileResponse)
+def reconcile_schedule(
+    request: schemas.ScheduleGenerateRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    with trace("reconcile") as current:
+        counts = services.reconcile_schedule(
+            db,
+            request.start_date,
+            request.days,
+            workers=request.workers,
+            partition_by=request.partition_by,
+        )
+    response.headers["Server-Timing"] = current.server_timing()
+    response.headers["X-Schedule-Trace"] = str(current.id)
+    return counts
+
+
+@router.get("/invalidations", response_model=schemas.ScheduleInvalidationsResponse)
+def pending_invalidations():
+    return invalidations.pending()
+
+
+@router.post("/regenerate", response_model=schemas.ScheduleRegenerateResponse)
+def regenerate_schedule(
+    request: schemas.ScheduleRegenerateRequest, db: Session = Depends(get_db)
+):
+    return services.regenerate_invalidated(db, request.start_date, request.days)
 
 
 @router.get("/export")
 def export_schedule(start_date: date, end_date: date, db: Session = Depends(get_db)):
-    assignments = services.list_schedule_assignments(db, start_date, end_date)
+    rows = services.iter_schedule_rows(db, start_date, end_date)
     workbook = Workbook()
     sheet = workbook.active
     sheet.title = "Programacion"
@@ -69,18 +338,18 @@ def export_schedule(start_date: date, end_date: date, db: Session = Depends(get_
             "Notas",
         ]
     )
-    for assignment in assignments:
+    for row in rows:
         sheet.append(
             [
-                assignment.shift_date.isoformat(),
-                assignment.rider.full_name if assignment.rider else "",
-                assignment.store.name if assignment.store else "",
-                assignment.external_brand.name if assignment.external_brand else "",
-                assignment.shift_type,
-                assignment.start_time or "",
-                assignment.end_time or "",
-                "SI" if assignment.manual_override else "NO",
-                assignment.notes or "",
+                row["shift_date"],
+                row["rider"]["full_name"] if row["rider"] else "",
+                row["store"]["name"] if row["store"] else "",
+                row["external_brand"]["name"] if row["external_brand"] else "",
+                row["shift_type"],
+                row["start_time"] or "",
+                row["end_time"] or "",
+                "SI" if row["manual_override"] else "NO",
+                row["notes"] or "",
             ]
         )
     output = BytesIO()
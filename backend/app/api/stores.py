@@ -1,21 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
+from app.api.conditional import conditional_json
 from app.database import get_db
 from app.schemas import schemas
 from app.services import services
+from app.services.reference import reference_cache
+from app.services.versions import versions
 
 router = APIRouter(prefix="/stores", tags=["stores"])
 
+_stores = TypeAdapter(List[schemas.PanpayaStore])
+
 
 @router.get("/", response_model=List[schemas.PanpayaStore])
 def list_stores(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db),
 ):
     """List all Panpaya stores"""
-    return services.get_stores(db, skip=skip, limit=limit)
+
+    def build():
+        stores = services.get_stores(db, skip=skip, limit=limit)
+        return _stores.dump_json(_stores.validate_python(stores, from_attributes=True)), None
+
+    return conditional_json(request, versions.etag("stores"), ("stores", skip, limit), build)
 
 
 @router.get("/{store_id}", response_model=schemas.PanpayaStore)
@@ -31,8 +43,7 @@ def get_store(store_id: int, db: Session = Depends(get_db)):
 def create_store(store: schemas.PanpayaStoreCreate, db: Session = Depends(get_db)):
     """Create a new Panpaya store"""
     # Check if store with same code already exists
-    db_store = services.get_store_by_code(db, store.code)
-    if db_store:
+    if store.code in reference_cache.stores(db).by_code:
         raise HTTPException(
             status_code=400, detail="Store with this code already exists"
         )
@@ -46,7 +57,7 @@ def update_store(
     """Update an existing store"""
     # If updating code, check it doesn't conflict with another store
     if store.code is not None:
-        existing = services.get_store_by_code(db, store.code)
+        existing = reference_cache.stores(db).by_code.get(store.code)
         if existing and existing.id != store_id:
             raise HTTPException(
                 status_code=400, detail="Store with this code already exists"
@@ -1,11 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import stores_router, riders_router, brands_router, schedules_router, imports_router
+from app.api import (
+    stores_router,
+    riders_router,
+    brands_router,
+    schedules_router,
+    imports_router,
+    admin_router,
+)
+from app.database import SessionLocal
+from app.services.jobs import job_runner
+from app.services.scheduling import check_engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_engine()
+    # Background jobs do not survive a restart; mark them as failed
+    db = SessionLocal()
+    try:
+        job_runner.recover_interrupted(db)
+    finally:
+        db.close()
+    yield
+
 
 app = FastAPI(
     title="Siteme - Shift Scheduling System",
     description="Local/offline shift scheduling system for Panpaya delivery riders",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS for local frontend development
@@ -15,6 +40,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # The frontend runs on another origin and cannot read other headers
+    expose_headers=[
+        "X-Next-After-Date",
+        "X-Next-After-Id",
+        "ETag",
+        "Server-Timing",
+        "X-Schedule-Trace",
+    ],
 )
 
 # Include routers
@@ -23,6 +56,7 @@ app.include_router(riders_router, prefix="/api")
 app.include_router(brands_router, prefix="/api")
 app.include_router(schedules_router, prefix="/api")
 app.include_router(imports_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
 
 
 @app.get("/health")
@@ -1,3 +1,19 @@
-from .models import PanpayaStore, Rider, ExternalBrand, ScheduleAssignment
+from .models import (
+    PanpayaStore,
+    Rider,
+    ExternalBrand,
+    ScheduleAssignment,
+    ScheduleJob,
+    ScheduleRangeLock,
+    RiderAbsence,
+)
 
-__all__ = ["PanpayaStore", "Rider", "ExternalBrand", "ScheduleAssignment"]
+__all__ = [
+    "PanpayaStore",
+    "Rider",
+    "ExternalBrand",
+    "ScheduleAssignment",
+    "ScheduleJob",
+    "ScheduleRangeLock",
+    "RiderAbsence",
+]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -41,6 +41,13 @@ class ExternalBrand(Base):
 class ScheduleAssignment(Base):
     """Daily assignment for a rider"""
     __tablename__ = "schedule_assignments"
+    # Filtered listings; each index also carries the id for (shift_date, id) keysets
+    __table_args__ = (
+        Index("ix_schedule_assignments_store_date", "store_id", "shift_date"),
+        Index("ix_schedule_assignments_rider_date", "rider_id", "shift_date"),
+        Index("ix_schedule_assignments_brand_date", "external_brand_id", "shift_date"),
+        Index("ix_schedule_assignments_manual_date", "manual_override", "shift_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     rider_id = Column(Integer, ForeignKey("riders.id"), nullable=False)
@@ -57,3 +64,47 @@ class ScheduleAssignment(Base):
     rider = relationship("Rider")
     store = relationship("PanpayaStore")
     external_brand = relationship("ExternalBrand")
+
+
+class ScheduleJob(Base):
+    """Background schedule generation run"""
+    __tablename__ = "schedule_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="QUEUED", index=True)  # QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED
+    start_date = Column(Date, nullable=False)
+    days = Column(Integer, nullable=False)
+    chunk_days = Column(Integer, nullable=False, default=7)
+    workers = Column(Integer, nullable=True)
+    partition_by = Column(String, nullable=True)
+    days_done = Column(Integer, nullable=False, default=0)
+    stores_done = Column(Integer, nullable=False, default=0)
+    assignments = Column(Integer, nullable=False, default=0)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ScheduleRangeLock(Base):
+    """One row per calendar date, row-locked by writers of that date"""
+    __tablename__ = "schedule_range_locks"
+
+    lock_date = Column(Date, primary_key=True)
+    acquired_at = Column(DateTime, nullable=True)
+
+
+class RiderAbsence(Base):
+    """Period in which a rider cannot be scheduled (vacaciones, incapacidad, etc.)"""
+    __tablename__ = "rider_absences"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rider_id = Column(Integer, ForeignKey("riders.id"), nullable=False, index=True)
+    start_date = Column(Date, nullable=True)  # None: open start
+    end_date = Column(Date, nullable=True)  # None: open end
+    reason = Column(String, nullable=False)  # VACACIONES, INCAPACIDAD, LICENCIA, PERMISO
+    notes = Column(String, nullable=True)
+    source = Column(String, nullable=False, default="MANUAL")  # MANUAL or OBSERVATION
+
+    rider = relationship("Rider")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import date
+from typing import Any, Dict, Literal, Optional, List
+from datetime import date, datetime
 
 
 # Panpaya Store schemas
@@ -59,6 +59,27 @@ class Rider(RiderBase):
         from_attributes = True
 
 
+# Rider absence schemas
+class RiderAbsenceBase(BaseModel):
+    start_date: Optional[date] = Field(None, description="First absent day (open if empty)")
+    end_date: Optional[date] = Field(None, description="Last absent day (open if empty)")
+    reason: str = Field(..., description="Reason (VACACIONES, INCAPACIDAD, LICENCIA, PERMISO)")
+    notes: Optional[str] = Field(None, description="Additional notes")
+
+
+class RiderAbsenceCreate(RiderAbsenceBase):
+    pass
+
+
+class RiderAbsence(RiderAbsenceBase):
+    id: int
+    rider_id: int
+    source: str = Field(..., description="MANUAL, or OBSERVATION when mirrored from the observation")
+
+    class Config:
+        from_attributes = True
+
+
 # External Brand schemas
 class ExternalBrandBase(BaseModel):
     name: str = Field(..., description="External brand name")
@@ -119,11 +140,141 @@ class ScheduleAssignmentDetail(ScheduleAssignment):
     external_brand: Optional[ExternalBrand] = None
 
 
+class SchedulePreviewAssignment(ScheduleAssignmentBase):
+    id: Optional[int] = Field(None, description="Set only for existing manual overrides")
+    rider: Optional[Rider] = None
+    store: Optional[PanpayaStore] = None
+    external_brand: Optional[ExternalBrand] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SchedulePreviewResponse(BaseModel):
+    fingerprint: str = Field(..., description="Hash of the inputs; use it to commit the preview")
+    start_date: date
+    days: int
+    cached: bool
+    assignments: List[SchedulePreviewAssignment]
+
+
 class ScheduleGenerateRequest(BaseModel):
     start_date: date
     days: int = Field(7, ge=1, le=31)
+    workers: Optional[int] = Field(
+        None, ge=1, le=64, description="Processes for the store pass (default from SCHEDULE_WORKERS)"
+    )
+    partition_by: Optional[Literal["zone", "store"]] = Field(
+        None, description="Split the store pass by store zone or by store"
+    )
+
+
+class ScheduleHorizonRequest(BaseModel):
+    start_date: date
+    days: int = Field(91, ge=1, le=366)
+    chunk_days: int = Field(7, ge=1, le=31, description="Days generated and committed per chunk")
+    workers: Optional[int] = Field(
+        None, ge=1, le=64, description="Processes for the store pass (default from SCHEDULE_WORKERS)"
+    )
+    partition_by: Optional[Literal["zone", "store"]] = Field(
+        None, description="Split the store pass by store zone or by store"
+    )
+
+
+class ScheduleHorizonResponse(BaseModel):
+    start_date: date
+    days: int
+    chunks: int
+    assignments: int
+
+
+class ScheduleJob(BaseModel):
+    id: int
+    status: str = Field(..., description="QUEUED, RUNNING, SUCCEEDED, FAILED or CANCELLED")
+    start_date: date
+    days: int
+    chunk_days: int
+    workers: Optional[int] = None
+    partition_by: Optional[str] = None
+    days_done: int
+    stores_done: int
+    assignments: int
+    cancel_requested: bool
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ScheduleReconcileResponse(BaseModel):
+    inserted: int
+    updated: int
+    deleted: int
+    unchanged: int
+
+
+class ScheduleRegenerateRequest(BaseModel):
+    start_date: date
+    days: int = Field(7, ge=1, le=31)
+
+
+class ScheduleRegenerateResponse(ScheduleReconcileResponse):
+    stores: int = Field(..., description="Stores replanned over the range")
+    dates: int = Field(..., description="Dates whose external-brand pass was replanned")
+
+
+class ScheduleInvalidationsResponse(BaseModel):
+    stores: List[int]
+    external_dates: List[date]
+    external_all: bool
+
+
+class ScheduleStatsResponse(BaseModel):
+    start_date: date
+    end_date: date
+    group_by: List[str]
+    rows: List[Dict[str, Any]] = Field(
+        ...,
+        description=(
+            "One row per group: the group_by keys (rider_id, store_id, external_brand_id, "
+            "zone, shift_type, week_start) with assignments, am, pm, doubles, rest, "
+            "external, available, manual and days counts"
+        ),
+    )
+
+
+class ScheduleUnassignedDay(BaseModel):
+    shift_date: date
+    rider_ids: List[int]
 
 
 class ScheduleDashboardResponse(BaseModel):
     assignments: List[ScheduleAssignmentDetail]
-    unassigned: List[int] = []
+    unassigned: List[int] = Field(
+        [], description="Active riders without an assignment on any day of the range"
+    )
+    unassigned_by_date: List[ScheduleUnassignedDay] = []
+
+
+class TraceSpan(BaseModel):
+    name: str
+    duration_ms: float
+    rows: Optional[int] = None
+    detail: Optional[Dict[str, int]] = None
+
+
+class Trace(BaseModel):
+    id: int
+    name: str
+    started_at: datetime
+    duration_ms: float
+    spans: List[TraceSpan]
+
+
+class ReferenceCacheStats(BaseModel):
+    table: str
+    hits: int
+    misses: int
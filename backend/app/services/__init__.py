@@ -10,16 +10,30 @@ from .services import (
     create_rider,
     update_rider,
     delete_rider,
+    get_rider_absences,
+    create_rider_absence,
+    delete_rider_absence,
+    sync_observation_absence,
     get_external_brand,
     get_external_brands,
     create_external_brand,
     update_external_brand,
     delete_external_brand,
     list_schedule_assignments,
+    list_schedule_rows,
+    iter_schedule_rows,
+    schedule_stats,
+    unassigned_riders,
+    schedule_dashboard,
     create_schedule_assignment,
     update_schedule_assignment,
     delete_schedule_assignment,
     generate_schedule,
+    generate_schedule_horizon,
+    reconcile_schedule,
+    regenerate_invalidated,
+    preview_schedule,
+    commit_preview,
 )
 
 __all__ = [
@@ -34,14 +48,28 @@ __all__ = [
     "create_rider",
     "update_rider",
     "delete_rider",
+    "get_rider_absences",
+    "create_rider_absence",
+    "delete_rider_absence",
+    "sync_observation_absence",
     "get_external_brand",
     "get_external_brands",
     "create_external_brand",
     "update_external_brand",
     "delete_external_brand",
     "list_schedule_assignments",
+    "list_schedule_rows",
+    "iter_schedule_rows",
+    "schedule_stats",
+    "unassigned_riders",
+    "schedule_dashboard",
     "create_schedule_assignment",
     "update_schedule_assignment",
     "delete_schedule_assignment",
     "generate_schedule",
+    "generate_schedule_horizon",
+    "reconcile_schedule",
+    "regenerate_invalidated",
+    "preview_schedule",
+    "commit_preview",
 ]
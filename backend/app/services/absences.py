@@ -0,0 +1,77 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from bisect import bisect_right
+from datetime import date, timedelta
+
+
+EXCEPTION_KEYWORDS = ["VACACIONES", "INCAPACIDAD", "LICENCIA", "PERMISO"]
+
+
+def observation_reason(observation: Optional[str]) -> Optional[str]:
+    """Absence reason named in a free-text observation, if any"""
+    if not observation:
+        return None
+    text = observation.upper()
+    return next((keyword for keyword in EXCEPTION_KEYWORDS if keyword in text), None)
+
+
+class AbsenceIndex:
+    """Absence periods per rider, merged and sorted; open ends extend to date.min/max"""
+
+    def __init__(self, periods: Iterable[Tuple[int, Optional[date], Optional[date]]]):
+        by_rider: Dict[int, List[Tuple[date, date]]] = {}
+        for rider_id, start_date, end_date in periods:
+            by_rider.setdefault(rider_id, []).append(
+                (start_date or date.min, end_date or date.max)
+            )
+        self._starts: Dict[int, List[date]] = {}
+        self._ends: Dict[int, List[date]] = {}
+        for rider_id, intervals in by_rider.items():
+            intervals.sort()
+            starts: List[date] = []
+            ends: List[date] = []
+            for start_date, end_date in intervals:
+                if start_date > end_date:
+                    continue
+                if ends and (ends[-1] == date.max or start_date <= ends[-1] + timedelta(days=1)):
+                    ends[-1] = max(ends[-1], end_date)
+                    continue
+                starts.append(start_date)
+                ends.append(end_date)
+            if starts:
+                self._starts[rider_id] = starts
+                self._ends[rider_id] = ends
+
+    def rider_ids(self) -> Set[int]:
+        return set(self._starts)
+
+    def _interval(self, rider_id: int, day: date) -> Optional[Tuple[date, date]]:
+        starts = self._starts.get(rider_id)
+        if not starts:
+            return None
+        index = bisect_right(starts, day) - 1
+        if index < 0 or self._ends[rider_id][index] < day:
+            return None
+        return starts[index], self._ends[rider_id][index]
+
+    def is_absent(self, rider_id: int, day: date) -> bool:
+        return self._interval(rider_id, day) is not None
+
+    def covers(self, rider_id: int, start_date: date, end_date: date) -> bool:
+        """Whether the rider is absent on every date of the range"""
+        interval = self._interval(rider_id, start_date)
+        return interval is not None and interval[1] >= end_date
+
+    def absent_dates(self, rider_id: int, start_date: date, end_date: date) -> List[date]:
+        """Dates of the range on which the rider is absent"""
+        starts = self._starts.get(rider_id, [])
+        ends = self._ends.get(rider_id, [])
+        result: List[date] = []
+        index = max(bisect_right(starts, start_date) - 1, 0)
+        while index < len(starts) and starts[index] <= end_date:
+            first = max(starts[index], start_date)
+            last = min(ends[index], end_date)
+            while first <= last:
+                result.append(first)
+                first += timedelta(days=1)
+            index += 1
+        return result
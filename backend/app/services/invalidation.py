@@ -0,0 +1,142 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.services.records import RiderKind, rider_kind
+from datetime import date, timedelta
+import threading
+
+
+# Inclusive (start, end) ranges, sorted and disjoint; an invalidation with
+# no date covers every date from date.min to date.max
+Ranges = List[Tuple[date, date]]
+EVERY_DATE = (date.min, date.max)
+
+
+def _add(ranges: Ranges, start_date: date, end_date: date) -> Ranges:
+    merged: Ranges = []
+    for start, end in sorted(ranges + [(start_date, end_date)]):
+        if merged and (merged[-1][1] == date.max or start <= merged[-1][1] + timedelta(days=1)):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _overlap(ranges: Ranges, start_date: date, end_date: date) -> Ranges:
+    return [
+        (max(start, start_date), min(end, end_date))
+        for start, end in ranges
+        if start <= end_date and end >= start_date
+    ]
+
+
+def _subtract(ranges: Ranges, start_date: date, end_date: date) -> Ranges:
+    remaining: Ranges = []
+    for start, end in ranges:
+        if end < start_date or start > end_date:
+            remaining.append((start, end))
+            continue
+        if start < start_date:
+            remaining.append((start, start_date - timedelta(days=1)))
+        if end > end_date:
+            remaining.append((end_date + timedelta(days=1), end))
+    return remaining
+
+
+def _dates(ranges: Ranges) -> Set[date]:
+    return {
+        date.fromordinal(ordinal)
+        for start, end in ranges
+        for ordinal in range(start.toordinal(), end.toordinal() + 1)
+    }
+
+
+# A store's rotation carries its counters from day to day, so a rider change
+# invalidates the store on every date; the external pass restarts daily.
+class ScheduleInvalidations:
+    """Slices of the generated schedule made stale by data changes, as date ranges"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stores: Dict[int, Ranges] = {}
+        self.external_ranges: Ranges = []
+
+    def store(self, store_id: Optional[int]) -> None:
+        if store_id is None:
+            return
+        with self._lock:
+            self.stores[store_id] = [EVERY_DATE]
+
+    def external(self, shift_date: Optional[date] = None) -> None:
+        with self._lock:
+            if shift_date is None:
+                self.external_ranges = [EVERY_DATE]
+            else:
+                self.external_ranges = _add(self.external_ranges, shift_date, shift_date)
+
+    def rider(
+        self,
+        rider_type: Optional[str],
+        store_id: Optional[int],
+        shift_date: Optional[date] = None,
+    ) -> None:
+        """Invalidate the slice a rider of this type and store plans into"""
+        if rider_kind(rider_type) == RiderKind.PANPAYA:
+            self.store(store_id)
+        else:
+            self.external(shift_date)
+
+    def everything(self, store_ids: Iterable[int]) -> None:
+        with self._lock:
+            for store_id in store_ids:
+                self.stores[store_id] = [EVERY_DATE]
+            self.external_ranges = [EVERY_DATE]
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not (self.stores or self.external_ranges)
+
+    def pending(self) -> dict:
+        """Stale stores and external dates; open-ended ranges set external_all"""
+        with self._lock:
+            bounded = [
+                (start, end)
+                for start, end in self.external_ranges
+                if start != date.min and end != date.max
+            ]
+            return {
+                "stores": sorted(self.stores),
+                "external_dates": sorted(_dates(bounded)),
+                "external_all": len(bounded) < len(self.external_ranges),
+            }
+
+    def consume(
+        self, start_date: date, end_date: date
+    ) -> Tuple[Set[int], Set[date]]:
+        """Take the stale stores and external dates of a range, clearing only that range"""
+        with self._lock:
+            stores = {
+                store_id
+                for store_id, ranges in self.stores.items()
+                if _overlap(ranges, start_date, end_date)
+            }
+            for store_id in stores:
+                ranges = _subtract(self.stores[store_id], start_date, end_date)
+                if ranges:
+                    self.stores[store_id] = ranges
+                else:
+                    del self.stores[store_id]
+            dates = _dates(_overlap(self.external_ranges, start_date, end_date))
+            self.external_ranges = _subtract(self.external_ranges, start_date, end_date)
+        return stores, dates
+
+    def restore(
+        self, stores: Set[int], dates: Set[date], start_date: date, end_date: date
+    ) -> None:
+        """Put back slices taken by consume() when regeneration failed"""
+        with self._lock:
+            for store_id in stores:
+                self.stores[store_id] = _add(self.stores.get(store_id, []), start_date, end_date)
+            for shift_date in dates:
+                self.external_ranges = _add(self.external_ranges, shift_date, shift_date)
+
+
+invalidations = ScheduleInvalidations()
@@ -0,0 +1,205 @@
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, Optional, Tuple
+from app.database import SessionLocal
+from app.models.models import ScheduleJob
+from app.services import services
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import os
+import threading
+
+
+# Background generation runs executed concurrently by this process
+DEFAULT_JOB_WORKERS = int(os.getenv("SCHEDULE_JOB_WORKERS", "2"))
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+CANCELLED = "CANCELLED"
+
+
+class JobCancelled(Exception):
+    """Raised from the progress hook when a running job was cancelled"""
+
+
+class RangeGuard:
+    """Blocks a job until no other job holds an overlapping date range"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._held: Dict[int, Tuple[date, date]] = {}
+
+    def _overlaps(self, start_date: date, end_date: date) -> bool:
+        return any(
+            start_date <= held_end and held_start <= end_date
+            for held_start, held_end in self._held.values()
+        )
+
+    def acquire(self, key: int, start_date: date, end_date: date) -> None:
+        with self._condition:
+            while self._overlaps(start_date, end_date):
+                self._condition.wait()
+            self._held[key] = (start_date, end_date)
+
+    def release(self, key: int) -> None:
+        with self._condition:
+            self._held.pop(key, None)
+            self._condition.notify_all()
+
+
+# Overlapping ranges run one after the other; an identical submission still
+# queued returns the queued job.
+class JobRunner:
+    """In-process executor for persisted schedule generation jobs"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: int = DEFAULT_JOB_WORKERS,
+    ):
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._guard = RangeGuard()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="schedule-job"
+                )
+            return self._executor
+
+    def submit(
+        self,
+        db: Session,
+        start_date: date,
+        days: int,
+        chunk_days: int = 7,
+        workers: Optional[int] = None,
+        partition_by: Optional[str] = None,
+    ) -> ScheduleJob:
+        queued = (
+            db.query(ScheduleJob)
+            .filter(
+                ScheduleJob.status == QUEUED,
+                ScheduleJob.start_date == start_date,
+                ScheduleJob.days == days,
+                ScheduleJob.chunk_days == chunk_days,
+                ScheduleJob.cancel_requested.is_(False),
+            )
+            .order_by(ScheduleJob.id.asc())
+            .first()
+        )
+        if queued is not None:
+            return queued
+        job = ScheduleJob(
+            status=QUEUED,
+            start_date=start_date,
+            days=days,
+            chunk_days=chunk_days,
+            workers=workers,
+            partition_by=partition_by,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._get_executor().submit(self._run, job.id)
+        return job
+
+    def get(self, db: Session, job_id: int) -> Optional[ScheduleJob]:
+        return db.query(ScheduleJob).filter(ScheduleJob.id == job_id).first()
+
+    def recent(self, db: Session, limit: int = 50) -> List[ScheduleJob]:
+        return db.query(ScheduleJob).order_by(ScheduleJob.id.desc()).limit(limit).all()
+
+    def cancel(self, db: Session, job_id: int) -> Optional[ScheduleJob]:
+        """Cancel a queued job, or stop a running one after its current chunk"""
+        job = self.get(db, job_id)
+        if job is None:
+            return None
+        if job.status == QUEUED:
+            job.status = CANCELLED
+            job.cancel_requested = True
+            job.finished_at = datetime.utcnow()
+        elif job.status == RUNNING:
+            job.cancel_requested = True
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def recover_interrupted(self, db: Session) -> int:
+        """Fail jobs left queued or running by a previous process"""
+        count = (
+            db.query(ScheduleJob)
+            .filter(ScheduleJob.status.in_([QUEUED, RUNNING]))
+            .update(
+                {
+                    ScheduleJob.status: FAILED,
+                    ScheduleJob.error: "Interrupted by a server restart",
+                    ScheduleJob.finished_at: datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return count
+
+    def _run(self, job_id: int) -> None:
+        db = self.session_factory()
+        try:
+            job = self.get(db, job_id)
+            if job is None or job.status != QUEUED:
+                return
+            end_date = job.start_date + timedelta(days=job.days - 1)
+            self._guard.acquire(job_id, job.start_date, end_date)
+            try:
+                self._execute(db, job)
+            finally:
+                self._guard.release(job_id)
+        finally:
+            db.close()
+
+    def _execute(self, db: Session, job: ScheduleJob) -> None:
+        db.refresh(job)
+        if job.status != QUEUED:
+            return
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+        def progress(state: Dict[str, int]) -> None:
+            job.days_done = state["days_done"]
+            job.stores_done = state["stores_done"]
+            job.assignments = state["assignments"]
+            db.commit()
+            db.refresh(job)
+            if job.cancel_requested:
+                raise JobCancelled()
+
+        try:
+            summary = services.generate_schedule_horizon(
+                db,
+                job.start_date,
+                job.days,
+                chunk_days=job.chunk_days,
+                workers=job.workers,
+                partition_by=job.partition_by,
+                progress=progress,
+            )
+            job.assignments = summary["assignments"]
+            job.status = SUCCEEDED
+        except JobCancelled:
+            db.rollback()
+            job.status = CANCELLED
+        except Exception as exc:
+            db.rollback()
+            job.status = FAILED
+            job.error = str(exc)
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+
+job_runner = JobRunner()
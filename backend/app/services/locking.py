@@ -0,0 +1,98 @@
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Hashable, Optional
+from app.models.models import ScheduleRangeLock
+from datetime import date, datetime, timedelta
+import threading
+
+
+def _insert_ignore(dialect_name: str):
+    statement = insert(ScheduleRangeLock.__table__)
+    if dialect_name == "sqlite":
+        return statement.prefix_with("OR IGNORE")
+    if dialect_name == "mysql":
+        return statement.prefix_with("IGNORE")
+    return statement
+
+
+def _ensure_lock_rows(db: Session, start_date: date, end_date: date) -> None:
+    days = (end_date - start_date).days + 1
+    existing = db.execute(
+        select(func.count())
+        .select_from(ScheduleRangeLock)
+        .where(ScheduleRangeLock.lock_date >= start_date)
+        .where(ScheduleRangeLock.lock_date <= end_date)
+    ).scalar_one()
+    if existing >= days:
+        return
+    # Created on a separate connection and committed at once, so the lock
+    # rows never share a transaction with the locking UPDATE below
+    engine = db.get_bind()
+    with engine.connect() as connection:
+        connection.execute(
+            _insert_ignore(engine.dialect.name),
+            [
+                {"lock_date": start_date + timedelta(days=offset)}
+                for offset in range(days)
+            ],
+        )
+        connection.commit()
+
+
+# Row locks on MySQL let disjoint ranges proceed; SQLite serializes every writer.
+def lock_range(db: Session, start_date: date, end_date: date) -> None:
+    """Lock a date range until the caller's commit or rollback"""
+    _ensure_lock_rows(db, start_date, end_date)
+    db.execute(
+        update(ScheduleRangeLock)
+        .where(ScheduleRangeLock.lock_date >= start_date)
+        .where(ScheduleRangeLock.lock_date <= end_date)
+        .values(acquired_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run overlapping calls with the same key once and share the result or exception"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+
+generation_flight = SingleFlight()
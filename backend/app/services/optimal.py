@@ -0,0 +1,274 @@
+"""Min-cost assignment engine: solves each store day, then goes greedy once over budget"""
+from typing import Dict, List, Optional, Set, Tuple
+from app.services.scheduling import (
+    PlannedShift,
+    Rotations,
+    SchedulingContext,
+    StorePartition,
+    StoreRotation,
+    plan_external_day,
+)
+from datetime import date
+import heapq
+import os
+import time
+import weakref
+
+
+# Wall-clock budget of one solver run before it falls back to the greedy picks
+DEFAULT_SOLVER_BUDGET_MS = int(os.getenv("SCHEDULE_SOLVER_BUDGET_MS", "2000"))
+
+
+# time.monotonic() is system-wide, so pool workers compare against the same instant
+def solver_deadline(budget_ms: Optional[int] = None) -> float:
+    """Absolute deadline shared by every pass of one run"""
+    if budget_ms is None:
+        budget_ms = DEFAULT_SOLVER_BUDGET_MS
+    return time.monotonic() + budget_ms / 1000
+
+
+# Hungarian method by successive shortest augmenting paths, O(rows^2 * columns);
+# ties go to the lowest column.
+def min_cost_assignment(costs: List[List[int]]) -> List[int]:
+    """Assign every row to a distinct column at minimum total cost"""
+    rows = len(costs)
+    columns = len(costs[0]) if rows else 0
+    infinity = float("inf")
+    u = [0] * (rows + 1)
+    v = [0] * (columns + 1)
+    owner = [0] * (columns + 1)
+    way = [0] * (columns + 1)
+    for row in range(1, rows + 1):
+        owner[0] = row
+        column = 0
+        min_slack = [infinity] * (columns + 1)
+        used = [False] * (columns + 1)
+        while True:
+            used[column] = True
+            current_row = owner[column]
+            delta = infinity
+            next_column = 0
+            row_costs = costs[current_row - 1]
+            for candidate in range(1, columns + 1):
+                if used[candidate]:
+                    continue
+                slack = row_costs[candidate - 1] - u[current_row] - v[candidate]
+                if slack < min_slack[candidate]:
+                    min_slack[candidate] = slack
+                    way[candidate] = column
+                if min_slack[candidate] < delta:
+                    delta = min_slack[candidate]
+                    next_column = candidate
+            for candidate in range(columns + 1):
+                if used[candidate]:
+                    u[owner[candidate]] += delta
+                    v[candidate] -= delta
+                else:
+                    min_slack[candidate] -= delta
+            column = next_column
+            if owner[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+    assignment = [0] * rows
+    for column in range(1, columns + 1):
+        if owner[column]:
+            assignment[owner[column] - 1] = column - 1
+    return assignment
+
+
+def _slot_cost(slot: str, rotation: StoreRotation, position: int, work: int, top: int) -> int:
+    if slot == "AM":
+        return 2 * rotation.am.counts[position] + 1 + 2 * work + 1
+    if slot == "PM":
+        return 2 * rotation.pm.counts[position] + 1 + 2 * work + 1
+    if slot == "AM Y PM":
+        return 2 * rotation.double[position] + 1 + 4 * work + 4
+    # Resting the busiest riders evens out the totals
+    return 2 * rotation.rest.counts[position] + 1 + top - work
+
+
+def assign_day_optimal(
+    rotation: StoreRotation,
+    shift_date: date,
+    plan: List[PlannedShift],
+    unavailable: Set[int],
+) -> None:
+    """Fill one store day by solving its slot/rider assignment"""
+    positions = [
+        position
+        for position, rider_id in enumerate(rotation.rider_ids)
+        if rider_id not in unavailable
+    ]
+    if not positions:
+        return
+    slots = ["DESCANSO"] if shift_date.weekday() % 2 == 1 else []
+    remaining = len(positions) - len(slots)
+    if remaining >= 2:
+        slots.extend(("AM", "PM"))
+    elif remaining == 1:
+        slots.append("AM Y PM")
+    am, pm, double = rotation.am.counts, rotation.pm.counts, rotation.double
+    work = [am[p] + pm[p] + 2 * double[p] for p in positions]
+    top = max(work)
+    costs = [
+        [
+            _slot_cost(slot, rotation, position, load, top)
+            for position, load in zip(positions, work)
+        ]
+        for slot in slots
+    ]
+    for slot, column in zip(slots, min_cost_assignment(costs)):
+        position = positions[column]
+        plan.append(
+            PlannedShift(rotation.rider_ids[position], rotation.store_id, None, shift_date, slot)
+        )
+        if slot == "AM":
+            rotation.am.increment(position)
+        elif slot == "PM":
+            rotation.pm.increment(position)
+        elif slot == "AM Y PM":
+            rotation.double[position] += 1
+        else:
+            rotation.rest.increment(position)
+
+
+def plan_store_partition_optimal(
+    partition: StorePartition,
+    schedule_dates: List[date],
+    manual_pairs: Set[Tuple[date, int]],
+    rotations: Optional[Rotations] = None,
+    absent_by_date: Optional[Dict[date, Set[int]]] = None,
+    deadline: Optional[float] = None,
+) -> Dict[int, List[List[PlannedShift]]]:
+    """Drop-in ``plan_store_partition`` that solves each day until ``deadline``, then goes greedy"""
+    if deadline is None:
+        deadline = solver_deadline()
+    manual_by_date: Dict[date, Set[int]] = {}
+    for shift_date, rider_id in manual_pairs:
+        manual_by_date.setdefault(shift_date, set()).add(rider_id)
+    result: Dict[int, List[List[PlannedShift]]] = {}
+    for store_id, rider_ids in partition:
+        rotation = rotations.get(store_id) if rotations is not None else None
+        if rotation is None:
+            rotation = StoreRotation(store_id, rider_ids)
+            if rotations is not None:
+                rotations[store_id] = rotation
+        per_day: List[List[PlannedShift]] = []
+        for shift_date in schedule_dates:
+            day_plan: List[PlannedShift] = []
+            absent = absent_by_date.get(shift_date, frozenset()) if absent_by_date else frozenset()
+            if time.monotonic() > deadline:
+                rotation.assign_day(shift_date, manual_pairs, day_plan, absent)
+            else:
+                unavailable = manual_by_date.get(shift_date, set()) | absent
+                assign_day_optimal(rotation, shift_date, day_plan, unavailable)
+            per_day.append(day_plan)
+        result[store_id] = per_day
+    return result
+
+
+# EXTERNO counts carry across days, so chunked runs share one ledger per context.
+class ExternalLedger:
+    """External-brand plans of a context, solved day by day from its start"""
+
+    def __init__(self, context: SchedulingContext):
+        self.context = context
+        self.loads: Dict[int, int] = {}
+        self.plans: Dict[date, List[PlannedShift]] = {}
+
+    def _solve(self, shift_date: date, deadline: float) -> List[PlannedShift]:
+        context = self.context
+        if time.monotonic() > deadline:
+            return plan_external_day(context, shift_date)
+        day_pool = (
+            context.external_pool_weekend
+            if shift_date.weekday() >= 5
+            else context.external_pool_weekday
+        )
+        unavailable = context.manual_riders_by_date.get(shift_date, set()) | (
+            context.absent_by_date.get(shift_date, set())
+        )
+        available = [r for r in day_pool if r.id not in unavailable]
+        # Brand slots all cost the same to a rider, so the min-cost flow
+        # reduces to taking the least loaded riders in pool order
+        chosen = heapq.nsmallest(
+            len(context.external_brands),
+            range(len(available)),
+            key=lambda index: (self.loads.get(available[index].id, 0), index),
+        )
+        plan = [
+            PlannedShift(available[index].id, None, brand.id, shift_date, "EXTERNO")
+            for brand, index in zip(context.external_brands, chosen)
+        ]
+        taken = set(chosen)
+        plan.extend(
+            PlannedShift(rider.id, None, None, shift_date, "DISPONIBLE")
+            for index, rider in enumerate(available)
+            if index not in taken
+        )
+        return plan
+
+    def day(self, shift_date: date, deadline: float) -> List[PlannedShift]:
+        for day in self.context.schedule_dates:
+            if day > shift_date:
+                break
+            if day in self.plans:
+                continue
+            plan = self._solve(day, deadline)
+            for shift in plan:
+                if shift.shift_type == "EXTERNO":
+                    self.loads[shift.rider_id] = self.loads.get(shift.rider_id, 0) + 1
+            self.plans[day] = plan
+        return self.plans[shift_date]
+
+
+_ledgers: "weakref.WeakKeyDictionary[SchedulingContext, ExternalLedger]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def plan_external_days_optimal(
+    context: SchedulingContext,
+    schedule_dates: List[date],
+    deadline: Optional[float] = None,
+) -> List[List[PlannedShift]]:
+    """External-brand plan of each date, balancing EXTERNO days across the pool"""
+    if deadline is None:
+        deadline = solver_deadline()
+    ledger = _ledgers.get(context)
+    if ledger is None:
+        ledger = _ledgers[context] = ExternalLedger(context)
+    return [ledger.day(shift_date, deadline) for shift_date in schedule_dates]
+
+
+def _spread(counts: List[int]) -> int:
+    return max(counts) - min(counts) if counts else 0
+
+
+def fairness_spread(context: SchedulingContext, plan: List[PlannedShift]) -> Dict[str, int]:
+    """Widest max-min gap per counter between riders of one store, or of the TC/FDS pool"""
+    totals: Dict[Tuple[int, str], int] = {}
+    for shift in plan:
+        key = (shift.rider_id, shift.shift_type)
+        totals[key] = totals.get(key, 0) + 1
+    spread = {"am": 0, "pm": 0, "rest": 0, "work": 0, "external": 0}
+    for riders in context.eligible_by_store.values():
+        ids = [r.id for r in riders]
+        am = [totals.get((r, "AM"), 0) for r in ids]
+        pm = [totals.get((r, "PM"), 0) for r in ids]
+        double = [totals.get((r, "AM Y PM"), 0) for r in ids]
+        spread["am"] = max(spread["am"], _spread(am))
+        spread["pm"] = max(spread["pm"], _spread(pm))
+        spread["rest"] = max(
+            spread["rest"], _spread([totals.get((r, "DESCANSO"), 0) for r in ids])
+        )
+        spread["work"] = max(
+            spread["work"], _spread([a + p + 2 * d for a, p, d in zip(am, pm, double)])
+        )
+    spread["external"] = _spread(
+        [totals.get((r.id, "EXTERNO"), 0) for r in context.external_pool_weekday]
+    )
+    return spread
@@ -0,0 +1,197 @@
+from sqlalchemy import ColumnElement, delete, insert, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional
+from app.models.models import ScheduleAssignment
+from app.services.scheduling import PlannedShift
+from app.services.tracing import span
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+import os
+
+
+# Rows per executemany batch when writing generated plans
+DEFAULT_CHUNK_SIZE = int(os.getenv("SCHEDULE_INSERT_CHUNK", "1000"))
+
+
+def _plan_row(shift: PlannedShift, created_at: datetime) -> dict:
+    return {
+        "rider_id": shift.rider_id,
+        "store_id": shift.store_id,
+        "external_brand_id": shift.external_brand_id,
+        "shift_date": shift.shift_date,
+        "shift_type": shift.shift_type,
+        "manual_override": False,
+        "created_at": created_at,
+    }
+
+
+def insert_plan(
+    db: Session, plan: Iterable[PlannedShift], chunk_size: Optional[int] = None
+) -> int:
+    """Write planned shifts with batched core INSERTs, bypassing the ORM"""
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    statement = insert(ScheduleAssignment.__table__)
+    created_at = datetime.utcnow()
+    inserted = 0
+    batch: List[dict] = []
+    for shift in plan:
+        batch.append(_plan_row(shift, created_at))
+        if len(batch) >= chunk_size:
+            db.execute(statement, batch)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        db.execute(statement, batch)
+        inserted += len(batch)
+    return inserted
+
+
+def delete_generated(db: Session, start_date: date, days: int) -> int:
+    """Remove the non-manual assignments of a date range"""
+    result = db.execute(
+        delete(ScheduleAssignment)
+        .where(ScheduleAssignment.shift_date >= start_date)
+        .where(ScheduleAssignment.shift_date < start_date + timedelta(days=days))
+        .where(ScheduleAssignment.manual_override.is_(False))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+# New ids are read back with one SELECT: after the delete the range holds no other
+# generated rows, and auto-increment ids grow in insertion order.
+def replace_generated(
+    db: Session,
+    plan: Iterable[PlannedShift],
+    start_date: date,
+    days: int,
+    chunk_size: Optional[int] = None,
+    ids: Optional[List[int]] = None,
+) -> int:
+    """Swap the generated rows of a range for a new plan, keeping manual overrides"""
+    with span("delete") as phase:
+        phase.rows = delete_generated(db, start_date, days)
+    with span("insert") as phase:
+        phase.rows = insert_plan(db, plan, chunk_size)
+    if ids is not None and phase.rows:
+        table = ScheduleAssignment.__table__
+        ids.extend(
+            db.execute(
+                select(table.c.id)
+                .where(table.c.shift_date >= start_date)
+                .where(table.c.shift_date < start_date + timedelta(days=days))
+                .where(table.c.manual_override.is_(False))
+                .order_by(table.c.id)
+            ).scalars()
+        )
+    return phase.rows
+
+
+def _plan_key(shift: PlannedShift) -> tuple:
+    return (
+        shift.rider_id,
+        shift.shift_date,
+        shift.store_id,
+        shift.external_brand_id,
+        shift.shift_type,
+    )
+
+
+def _update_row(row_id: int, shift: PlannedShift) -> dict:
+    return {
+        "id": row_id,
+        "rider_id": shift.rider_id,
+        "store_id": shift.store_id,
+        "external_brand_id": shift.external_brand_id,
+        "shift_type": shift.shift_type,
+    }
+
+
+# Leftover rows are reused through UPDATE, same rider and date first, so ids stay stable.
+def reconcile_generated(
+    db: Session,
+    plan: Iterable[PlannedShift],
+    start_date: date,
+    days: int,
+    chunk_size: Optional[int] = None,
+    scope: Optional[ColumnElement] = None,
+) -> Dict[str, int]:
+    """Write only the generated rows that differ from a new plan, keeping manual overrides"""
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    table = ScheduleAssignment.__table__
+    query = (
+        select(
+            table.c.id,
+            table.c.rider_id,
+            table.c.shift_date,
+            table.c.store_id,
+            table.c.external_brand_id,
+            table.c.shift_type,
+        )
+        .where(table.c.shift_date >= start_date)
+        .where(table.c.shift_date < start_date + timedelta(days=days))
+        .where(table.c.manual_override.is_(False))
+        .order_by(table.c.id.asc())
+    )
+    if scope is not None:
+        query = query.where(scope)
+    existing = db.execute(query).all()
+    existing_by_key: Dict[tuple, List[int]] = defaultdict(list)
+    for row in existing:
+        existing_by_key[tuple(row[1:])].append(row.id)
+
+    unchanged = 0
+    pending: List[PlannedShift] = []
+    for shift in plan:
+        ids = existing_by_key.get(_plan_key(shift))
+        if ids:
+            ids.pop(0)
+            unchanged += 1
+        else:
+            pending.append(shift)
+
+    # Reuse leftover rows: first for the same rider and date, then for the
+    # same slot (date, store or brand, shift) handed to another rider
+    by_rider_day: Dict[tuple, List[int]] = defaultdict(list)
+    slot_of: Dict[int, tuple] = {}
+    for key, ids in existing_by_key.items():
+        for row_id in ids:
+            by_rider_day[(key[0], key[1])].append(row_id)
+            slot_of[row_id] = key[1:]
+    updates: List[dict] = []
+    unmatched: List[PlannedShift] = []
+    for shift in pending:
+        ids = by_rider_day.get((shift.rider_id, shift.shift_date))
+        if ids:
+            updates.append(_update_row(ids.pop(0), shift))
+        else:
+            unmatched.append(shift)
+    by_slot: Dict[tuple, List[int]] = defaultdict(list)
+    for ids in by_rider_day.values():
+        for row_id in ids:
+            by_slot[slot_of[row_id]].append(row_id)
+    inserts: List[PlannedShift] = []
+    for shift in unmatched:
+        ids = by_slot.get(_plan_key(shift)[1:])
+        if ids:
+            updates.append(_update_row(ids.pop(0), shift))
+        else:
+            inserts.append(shift)
+    deletes = sorted(row_id for ids in by_slot.values() for row_id in ids)
+
+    for offset in range(0, len(deletes), chunk_size):
+        db.execute(
+            delete(ScheduleAssignment)
+            .where(ScheduleAssignment.id.in_(deletes[offset : offset + chunk_size]))
+            .execution_options(synchronize_session=False)
+        )
+    for offset in range(0, len(updates), chunk_size):
+        # ORM bulk UPDATE by primary key, sent as one executemany
+        db.execute(update(ScheduleAssignment), updates[offset : offset + chunk_size])
+    inserted = insert_plan(db, inserts, chunk_size)
+    return {
+        "inserted": inserted,
+        "updated": len(updates),
+        "deleted": len(deletes),
+        "unchanged": unchanged,
+    }
@@ -0,0 +1,75 @@
+from typing import List, Optional
+from app.services.scheduling import PlannedShift, SchedulingContext
+from collections import OrderedDict
+from datetime import date
+import hashlib
+import os
+import threading
+
+
+# Previews kept in memory; each entry holds a full plan
+DEFAULT_PREVIEW_CACHE_SIZE = int(os.getenv("SCHEDULE_PREVIEW_CACHE", "16"))
+
+
+class StalePreviewError(Exception):
+    """The inputs changed after the preview was computed"""
+
+
+def fingerprint(context: SchedulingContext) -> str:
+    """Stable hash of every input that can change a generated plan"""
+    digest = hashlib.sha256()
+    digest.update(f"{context.start_date.isoformat()}|{context.days}\n".encode())
+    for rider in context.riders:
+        digest.update(
+            f"r|{rider.id}|{rider.rider_type}|{rider.store_id}|{rider.observation}\n".encode()
+        )
+    for store in context.stores:
+        digest.update(f"s|{store.id}\n".encode())
+    for brand in context.external_brands:
+        digest.update(f"b|{brand.id}|{brand.name}\n".encode())
+    for rider_id, start_date, end_date in context.absence_periods:
+        digest.update(f"a|{rider_id}|{start_date}|{end_date}\n".encode())
+    for shift_date, rider_id in sorted(context.manual_pairs):
+        digest.update(f"m|{shift_date.isoformat()}|{rider_id}\n".encode())
+    return digest.hexdigest()
+
+
+class PreviewEntry:
+    def __init__(self, start_date: date, days: int, plan: List[PlannedShift]):
+        self.start_date = start_date
+        self.days = days
+        self.plan = plan
+
+
+class PreviewCache:
+    """Thread-safe LRU of computed plans keyed by input fingerprint"""
+
+    def __init__(self, max_entries: int = DEFAULT_PREVIEW_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, PreviewEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[PreviewEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: PreviewEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> Optional[PreviewEntry]:
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+preview_cache = PreviewCache()
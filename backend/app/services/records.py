@@ -0,0 +1,123 @@
+"""Slotted copies of the rider, store and brand columns the scheduler reads"""
+from typing import Any, Dict, Optional
+from enum import IntEnum
+from app.models.models import ExternalBrand, PanpayaStore, Rider
+
+
+class RiderKind(IntEnum):
+    OTHER = 0
+    PANPAYA = 1
+    TC = 2
+    FDS = 3
+    EXTERNO = 4
+
+
+_KIND_BY_TYPE = {
+    "PANPAYA": RiderKind.PANPAYA,
+    "TC": RiderKind.TC,
+    "TIEMPO_COMPLETO": RiderKind.TC,
+    "FDS": RiderKind.FDS,
+    "FIN_DE_SEMANA": RiderKind.FDS,
+    "EXTERNO": RiderKind.EXTERNO,
+}
+
+
+def rider_kind(rider_type: Optional[str]) -> RiderKind:
+    return _KIND_BY_TYPE.get((rider_type or "").upper(), RiderKind.OTHER)
+
+
+class RiderRecord:
+    __slots__ = (
+        "id",
+        "full_name",
+        "active",
+        "rider_type",
+        "identification",
+        "store_id",
+        "observation",
+        "kind",
+    )
+    # Projection order matches the constructor arguments
+    columns = (
+        Rider.id,
+        Rider.full_name,
+        Rider.active,
+        Rider.rider_type,
+        Rider.identification,
+        Rider.store_id,
+        Rider.observation,
+    )
+
+    def __init__(
+        self,
+        id: int,
+        full_name: str,
+        active: bool,
+        rider_type: str,
+        identification: Optional[str],
+        store_id: Optional[int],
+        observation: Optional[str],
+    ):
+        self.id = id
+        self.full_name = full_name
+        self.active = active
+        self.rider_type = rider_type
+        self.identification = identification
+        self.store_id = store_id
+        self.observation = observation
+        self.kind = rider_kind(rider_type)
+
+    @classmethod
+    def from_instance(cls, rider: Any) -> "RiderRecord":
+        return cls(*(getattr(rider, column.key) for column in cls.columns))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {column.key: getattr(self, column.key) for column in self.columns}
+
+
+class StoreRecord:
+    __slots__ = ("id", "code", "name", "zone", "address")
+    columns = (
+        PanpayaStore.id,
+        PanpayaStore.code,
+        PanpayaStore.name,
+        PanpayaStore.zone,
+        PanpayaStore.address,
+    )
+
+    def __init__(
+        self,
+        id: int,
+        code: str,
+        name: str,
+        zone: Optional[str],
+        address: Optional[str],
+    ):
+        self.id = id
+        self.code = code
+        self.name = name
+        self.zone = zone
+        self.address = address
+
+    @classmethod
+    def from_instance(cls, store: Any) -> "StoreRecord":
+        return cls(*(getattr(store, column.key) for column in cls.columns))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {column.key: getattr(self, column.key) for column in self.columns}
+
+
+class BrandRecord:
+    __slots__ = ("id", "name")
+    columns = (ExternalBrand.id, ExternalBrand.name)
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+
+    @classmethod
+    def from_instance(cls, brand: Any) -> "BrandRecord":
+        return cls(brand.id, brand.name)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name}
@@ -0,0 +1,129 @@
+"""In-process cache of the active riders, stores and brands, revalidated by ``versions``"""
+from typing import Dict, List, Optional
+from collections import defaultdict
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app.models.models import ExternalBrand, PanpayaStore, Rider
+from app.services.records import BrandRecord, RiderRecord, StoreRecord
+from app.services.versions import versions
+import threading
+import weakref
+
+
+class ReferenceTable:
+    """One version of a table: records in query order, indexed by id"""
+
+    def __init__(self, version: int, rows: List):
+        self.version = version
+        self.rows = rows
+        self.by_id = {row.id: row for row in rows}
+
+
+class StoreTable(ReferenceTable):
+    def __init__(self, version: int, rows: List[StoreRecord]):
+        super().__init__(version, rows)
+        self.by_code: Dict[str, StoreRecord] = {row.code: row for row in rows}
+        self.by_name: Dict[str, StoreRecord] = {}
+        for row in rows:
+            self.by_name.setdefault(row.name, row)
+
+
+class BrandTable(ReferenceTable):
+    def __init__(self, version: int, rows: List[BrandRecord]):
+        super().__init__(version, rows)
+        self.by_name: Dict[str, BrandRecord] = {row.name: row for row in rows}
+
+
+# Table name -> (query, record, table class); the orders are the ones the
+# scheduler depends on
+_TABLES = {
+    "riders": (
+        select(*RiderRecord.columns).where(Rider.active.is_(True)).order_by(Rider.id.asc()),
+        RiderRecord,
+        ReferenceTable,
+    ),
+    "stores": (
+        select(*StoreRecord.columns).order_by(PanpayaStore.id.asc()),
+        StoreRecord,
+        StoreTable,
+    ),
+    "brands": (
+        select(*BrandRecord.columns).order_by(ExternalBrand.name.asc()),
+        BrandRecord,
+        BrandTable,
+    ),
+}
+
+
+def _load(db: Session, query) -> List:
+    bind = db.get_bind()
+    # A single shared connection cannot hold a snapshot older than itself
+    if not isinstance(bind, Engine) or isinstance(bind.pool, StaticPool):
+        return db.execute(query).all()
+    with bind.connect() as connection:
+        return connection.execute(query).all()
+
+
+# The version is read before loading, and rows load on their own connection: the
+# caller's REPEATABLE READ snapshot may predate the write behind the counter.
+class ReferenceCache:
+    """Thread-safe per-engine cache of the reference tables"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables: "weakref.WeakKeyDictionary[object, Dict[str, ReferenceTable]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+
+    def _get(self, db: Session, table: str) -> ReferenceTable:
+        bind = db.get_bind()
+        version = versions.version(table)
+        with self._lock:
+            tables = self._tables.setdefault(bind, {})
+            cached = tables.get(table)
+            if cached is not None and cached.version == version:
+                self.hits[table] += 1
+                return cached
+            self.misses[table] += 1
+        query, record, kind = _TABLES[table]
+        loaded = kind(version, [record(*row) for row in _load(db, query)])
+        with self._lock:
+            cached = tables.get(table)
+            if cached is None or cached.version <= version:
+                tables[table] = loaded
+        return loaded
+
+    def riders(self, db: Session) -> ReferenceTable:
+        """Active riders ordered by id"""
+        return self._get(db, "riders")
+
+    def stores(self, db: Session) -> StoreTable:
+        """Stores ordered by id"""
+        return self._get(db, "stores")
+
+    def brands(self, db: Session) -> BrandTable:
+        """External brands ordered by name"""
+        return self._get(db, "brands")
+
+    def store(self, db: Session, store_id: Optional[int]) -> Optional[StoreRecord]:
+        return self.stores(db).by_id.get(store_id)
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            return [
+                {"table": table, "hits": self.hits[table], "misses": self.misses[table]}
+                for table in _TABLES
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self.hits.clear()
+            self.misses.clear()
+
+
+reference_cache = ReferenceCache()
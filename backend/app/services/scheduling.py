@@ -0,0 +1,557 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from typing import AbstractSet, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+from app.models.models import (
+    PanpayaStore,
+    Rider,
+    ExternalBrand,
+    ScheduleAssignment,
+    RiderAbsence,
+)
+from app.services.absences import AbsenceIndex
+from app.services.records import BrandRecord, RiderKind, RiderRecord, StoreRecord
+from app.services.reference import reference_cache
+from app.services.tracing import span
+from datetime import date, timedelta
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import heapq
+import os
+import time
+
+
+# Process pool used for the store pass; 1 keeps generation in-process
+DEFAULT_WORKERS = int(os.getenv("SCHEDULE_WORKERS", "1"))
+DEFAULT_PARTITION = os.getenv("SCHEDULE_PARTITION", "zone")
+# Engine: "heap" (per-store heaps), "numpy" (batched arrays) or "flow"
+# (min-cost assignment with a time budget, falling back to the heap picks)
+DEFAULT_ENGINE = os.getenv("SCHEDULE_ENGINE", "heap")
+ENGINES = ("heap", "numpy", "flow")
+# Engines that reproduce the original greedy rotation row for row
+GREEDY_ENGINES = ("heap", "numpy")
+
+
+
+class SchedulingContext:
+    """Snapshot of the data used by the schedule generator, indexed for lookups"""
+
+    def __init__(
+        self,
+        riders: List[Union[Rider, RiderRecord]],
+        stores: List[Union[PanpayaStore, StoreRecord]],
+        external_brands: List[Union[ExternalBrand, BrandRecord]],
+        manual_assignments: List[ScheduleAssignment],
+        start_date: date,
+        days: int,
+        absences: Iterable[RiderAbsence] = (),
+    ):
+        self.riders = [
+            r if isinstance(r, RiderRecord) else RiderRecord.from_instance(r) for r in riders
+        ]
+        self.stores = [
+            s if isinstance(s, StoreRecord) else StoreRecord.from_instance(s) for s in stores
+        ]
+        self.external_brands = [
+            b if isinstance(b, BrandRecord) else BrandRecord.from_instance(b)
+            for b in external_brands
+        ]
+        self.start_date = start_date
+        self.days = days
+        self.schedule_dates = [
+            start_date + timedelta(days=offset) for offset in range(days)
+        ]
+
+        self.riders_by_id: Dict[int, RiderRecord] = {r.id: r for r in self.riders}
+        self.stores_by_id: Dict[int, StoreRecord] = {s.id: s for s in self.stores}
+        self.brands_by_id: Dict[int, BrandRecord] = {
+            b.id: b for b in self.external_brands
+        }
+
+        # Kind buckets keep the rider order
+        self.riders_by_kind: Dict[RiderKind, List[RiderRecord]] = {
+            kind: [] for kind in RiderKind
+        }
+        for rider in self.riders:
+            self.riders_by_kind[rider.kind].append(rider)
+        self.ppy_riders = self.riders_by_kind[RiderKind.PANPAYA]
+        self.tc_riders = self.riders_by_kind[RiderKind.TC]
+        self.fds_riders = self.riders_by_kind[RiderKind.FDS]
+        if not self.tc_riders:
+            self.tc_riders = self.riders_by_kind[RiderKind.EXTERNO]
+        self.fds_ids: Set[int] = {r.id for r in self.fds_riders}
+
+        # Riders absent for the whole horizon never enter a rotation; shorter
+        # absences are expanded into the dates they cover
+        self.absence_periods = sorted(
+            (a.rider_id, a.start_date or date.min, a.end_date or date.max)
+            for a in absences
+            if a.rider_id in self.riders_by_id
+        )
+        self.absences = AbsenceIndex(self.absence_periods)
+        end_date = self.end_date
+        self.exception_ids: Set[int] = set()
+        self.absent_by_date: Dict[date, Set[int]] = {}
+        for rider_id in self.absences.rider_ids():
+            if self.absences.covers(rider_id, start_date, end_date):
+                self.exception_ids.add(rider_id)
+                continue
+            for day in self.absences.absent_dates(rider_id, start_date, end_date):
+                self.absent_by_date.setdefault(day, set()).add(rider_id)
+
+        self.riders_by_store: Dict[int, List[RiderRecord]] = {}
+        self.eligible_by_store: Dict[int, List[RiderRecord]] = {}
+        for rider in self.ppy_riders:
+            self.riders_by_store.setdefault(rider.store_id, []).append(rider)
+            if rider.id not in self.exception_ids:
+                self.eligible_by_store.setdefault(rider.store_id, []).append(rider)
+
+        self.external_pool: List[RiderRecord] = self.tc_riders + self.fds_riders
+        # FDS riders only cover weekends
+        self.external_pool_weekend: List[RiderRecord] = [
+            r for r in self.external_pool if r.id not in self.exception_ids
+        ]
+        self.external_pool_weekday: List[RiderRecord] = [
+            r for r in self.external_pool_weekend if r.id not in self.fds_ids
+        ]
+
+        self.manual_assignments = manual_assignments
+        self.manual_pairs: Set[Tuple[date, int]] = {
+            (item.shift_date, item.rider_id) for item in manual_assignments
+        }
+        self.manual_riders_by_date: Dict[date, Set[int]] = {}
+        for shift_date, rider_id in self.manual_pairs:
+            self.manual_riders_by_date.setdefault(shift_date, set()).add(rider_id)
+
+    @property
+    def end_date(self) -> date:
+        return self.start_date + timedelta(days=self.days - 1)
+
+    def is_available(self, rider_id: int, day: date) -> bool:
+        return rider_id not in self.exception_ids and not self.absences.is_absent(
+            rider_id, day
+        )
+
+    @classmethod
+    def load(cls, db: Session, start_date: date, days: int) -> "SchedulingContext":
+        """Read every input of a generation run in a handful of queries"""
+        riders = reference_cache.riders(db).rows
+        stores = reference_cache.stores(db).rows
+        external_brands = reference_cache.brands(db).rows
+        manual_assignments = (
+            db.query(ScheduleAssignment)
+            .filter(ScheduleAssignment.manual_override.is_(True))
+            .filter(ScheduleAssignment.shift_date >= start_date)
+            .filter(ScheduleAssignment.shift_date < start_date + timedelta(days=days))
+            .all()
+        )
+        end_date = start_date + timedelta(days=days - 1)
+        absences = (
+            db.query(RiderAbsence)
+            .filter(
+                or_(RiderAbsence.start_date.is_(None), RiderAbsence.start_date <= end_date)
+            )
+            .filter(
+                or_(RiderAbsence.end_date.is_(None), RiderAbsence.end_date >= start_date)
+            )
+            .all()
+        )
+        return cls(
+            riders,
+            stores,
+            external_brands,
+            manual_assignments,
+            start_date,
+            days,
+            absences,
+        )
+
+
+class FairnessQueue:
+    """Min-heap over one fairness counter; ties go to the rider listed first"""
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self._heap = [(0, position) for position in range(size)]
+
+    @classmethod
+    def from_counts(cls, counts: List[int]) -> "FairnessQueue":
+        queue = cls(0)
+        queue.counts = list(counts)
+        queue._heap = [(count, position) for position, count in enumerate(counts)]
+        heapq.heapify(queue._heap)
+        return queue
+
+    def _prune(self) -> None:
+        heap = self._heap
+        while heap and heap[0][0] != self.counts[heap[0][1]]:
+            heapq.heappop(heap)
+
+    def peek(self, exclude: AbstractSet[int] = frozenset()) -> Optional[int]:
+        """Position of the least loaded rider outside ``exclude``"""
+        skipped = []
+        candidate = None
+        while True:
+            self._prune()
+            if not self._heap:
+                break
+            top = self._heap[0]
+            if top[1] not in exclude:
+                candidate = top[1]
+                break
+            skipped.append(heapq.heappop(self._heap))
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return candidate
+
+    def increment(self, position: int) -> None:
+        self.counts[position] += 1
+        heapq.heappush(self._heap, (self.counts[position], position))
+
+
+class PlannedShift(NamedTuple):
+    """Plain, picklable row of a generated plan"""
+
+    rider_id: int
+    store_id: Optional[int]
+    external_brand_id: Optional[int]
+    shift_date: date
+    shift_type: str
+
+
+class StoreRotation:
+    """AM/PM/rest fairness state for the eligible riders of one store"""
+
+    def __init__(self, store_id: int, rider_ids: List[int]):
+        self.store_id = store_id
+        self.rider_ids = rider_ids
+        self.positions = {rider_id: position for position, rider_id in enumerate(rider_ids)}
+        self.am = FairnessQueue(len(rider_ids))
+        self.pm = FairnessQueue(len(rider_ids))
+        self.rest = FairnessQueue(len(rider_ids))
+        self.double = [0] * len(rider_ids)
+
+    @classmethod
+    def from_counts(
+        cls,
+        store_id: int,
+        rider_ids: List[int],
+        am: List[int],
+        pm: List[int],
+        rest: List[int],
+        double: List[int],
+    ) -> "StoreRotation":
+        """Rebuild a rotation from plain counters, e.g. from another engine"""
+        rotation = cls(store_id, rider_ids)
+        rotation.am = FairnessQueue.from_counts(am)
+        rotation.pm = FairnessQueue.from_counts(pm)
+        rotation.rest = FairnessQueue.from_counts(rest)
+        rotation.double = list(double)
+        return rotation
+
+    def _shift(self, rider_id: int, shift_date: date, shift_type: str) -> PlannedShift:
+        return PlannedShift(rider_id, self.store_id, None, shift_date, shift_type)
+
+    def _assign_shifts(
+        self,
+        shift_date: date,
+        manual_pairs: Set[Tuple[date, int]],
+        plan: List[PlannedShift],
+        exclude: AbstractSet[int],
+    ) -> None:
+        am_position = self.am.peek(exclude)
+        if am_position is None:
+            return
+        pm_position = self.pm.peek(exclude)
+        am_rider_id = self.rider_ids[am_position]
+        pm_rider_id = self.rider_ids[pm_position]
+        if am_position == pm_position:
+            if (shift_date, am_rider_id) in manual_pairs:
+                return
+            plan.append(self._shift(am_rider_id, shift_date, "AM Y PM"))
+            self.double[am_position] += 1
+            return
+        if (shift_date, am_rider_id) not in manual_pairs:
+            plan.append(self._shift(am_rider_id, shift_date, "AM"))
+            self.am.increment(am_position)
+        if (shift_date, pm_rider_id) not in manual_pairs:
+            plan.append(self._shift(pm_rider_id, shift_date, "PM"))
+            self.pm.increment(pm_position)
+
+    def assign_day(
+        self,
+        shift_date: date,
+        manual_pairs: Set[Tuple[date, int]],
+        plan: List[PlannedShift],
+        absent: AbstractSet[int] = frozenset(),
+    ) -> None:
+        """Plan one day; ``absent`` holds rider ids that cannot work it"""
+        exclude = {self.positions[r] for r in absent if r in self.positions}
+        if shift_date.weekday() % 2 == 0:
+            self._assign_shifts(shift_date, manual_pairs, plan, exclude)
+            return
+        rest_position = self.rest.peek(exclude)
+        if rest_position is None:
+            return
+        rest_rider_id = self.rider_ids[rest_position]
+        if (shift_date, rest_rider_id) not in manual_pairs:
+            plan.append(self._shift(rest_rider_id, shift_date, "DESCANSO"))
+            self.rest.increment(rest_position)
+        self._assign_shifts(shift_date, manual_pairs, plan, exclude | {rest_position})
+
+
+# A partition is a list of (store_id, eligible rider ids) entries
+StorePartition = List[Tuple[int, List[int]]]
+
+
+def partition_stores(
+    context: SchedulingContext, partition_by: str = "zone", workers: int = 1
+) -> List[StorePartition]:
+    """Split the stores with eligible riders into independent work units"""
+    entries = [
+        (store, [r.id for r in context.eligible_by_store[store.id]])
+        for store in context.stores
+        if context.eligible_by_store.get(store.id)
+    ]
+    if partition_by == "zone":
+        by_zone: Dict[Optional[str], StorePartition] = {}
+        for store, rider_ids in entries:
+            by_zone.setdefault(store.zone, []).append((store.id, rider_ids))
+        return list(by_zone.values())
+    if partition_by == "store":
+        chunks = max(1, min(workers, len(entries)))
+        return [
+            [
+                (store.id, rider_ids)
+                for store, rider_ids in entries[
+                    index * len(entries) // chunks : (index + 1) * len(entries) // chunks
+                ]
+            ]
+            for index in range(chunks)
+        ]
+    raise ValueError(f"Unknown partition mode: {partition_by}")
+
+
+# Rotation state per store id, carried between consecutive date chunks
+Rotations = Dict[int, StoreRotation]
+
+
+# ``rotations`` carries the state from one chunk of dates to the next.
+def plan_store_partition(
+    partition: StorePartition,
+    schedule_dates: List[date],
+    manual_pairs: Set[Tuple[date, int]],
+    rotations: Optional[Rotations] = None,
+    absent_by_date: Optional[Dict[date, Set[int]]] = None,
+) -> Dict[int, List[List[PlannedShift]]]:
+    """Run the store rotations of one partition over a run of dates"""
+    result: Dict[int, List[List[PlannedShift]]] = {}
+    for store_id, rider_ids in partition:
+        rotation = rotations.get(store_id) if rotations is not None else None
+        if rotation is None:
+            rotation = StoreRotation(store_id, rider_ids)
+            if rotations is not None:
+                rotations[store_id] = rotation
+        per_day: List[List[PlannedShift]] = []
+        for shift_date in schedule_dates:
+            day_plan: List[PlannedShift] = []
+            absent = absent_by_date.get(shift_date, frozenset()) if absent_by_date else frozenset()
+            rotation.assign_day(shift_date, manual_pairs, day_plan, absent)
+            per_day.append(day_plan)
+        result[store_id] = per_day
+    return result
+
+
+def check_engine(engine: str = DEFAULT_ENGINE) -> None:
+    """Fail at startup rather than on the first run if an engine cannot load"""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown scheduling engine: {engine}")
+    if engine == "numpy":
+        from app.services.vectorized import HAS_NUMPY
+
+        if not HAS_NUMPY:
+            raise RuntimeError(
+                "SCHEDULE_ENGINE=numpy requires numpy; "
+                "install it with pip install -r requirements-optional.txt"
+            )
+
+
+def _partition_planner(engine: str, deadline: Optional[float] = None):
+    """Store planner of an engine; ``deadline`` bounds the flow solver's run"""
+    if engine == "heap":
+        return plan_store_partition
+    if engine == "numpy":
+        from app.services.vectorized import plan_store_partition_vectorized
+
+        return plan_store_partition_vectorized
+    if engine == "flow":
+        from app.services.optimal import plan_store_partition_optimal
+
+        return functools.partial(plan_store_partition_optimal, deadline=deadline)
+    raise ValueError(f"Unknown scheduling engine: {engine}")
+
+
+def _plan_store_partition_job(
+    job: Tuple[
+        StorePartition,
+        List[date],
+        Set[Tuple[date, int]],
+        Rotations,
+        Dict[date, Set[int]],
+        str,
+        Optional[float],
+    ]
+) -> Tuple[Dict[int, List[List[PlannedShift]]], Rotations]:
+    partition, schedule_dates, manual_pairs, rotations, absent_by_date, engine, deadline = job
+    plans = _partition_planner(engine, deadline)(
+        partition, schedule_dates, manual_pairs, rotations, absent_by_date
+    )
+    return plans, rotations
+
+
+def plan_store_pass(
+    context: SchedulingContext,
+    workers: int = 1,
+    partition_by: str = "zone",
+    schedule_dates: Optional[List[date]] = None,
+    rotations: Optional[Rotations] = None,
+    engine: str = DEFAULT_ENGINE,
+    deadline: Optional[float] = None,
+) -> Dict[int, List[List[PlannedShift]]]:
+    """Plan every store, optionally spreading partitions over a process pool"""
+    if schedule_dates is None:
+        schedule_dates = context.schedule_dates
+    planner = _partition_planner(engine, deadline)
+    partitions = partition_stores(context, partition_by, workers)
+    if workers <= 1 or len(partitions) <= 1:
+        result: Dict[int, List[List[PlannedShift]]] = {}
+        for partition in partitions:
+            result.update(
+                planner(
+                    partition,
+                    schedule_dates,
+                    context.manual_pairs,
+                    rotations,
+                    context.absent_by_date,
+                )
+            )
+        return result
+    jobs = []
+    for partition in partitions:
+        rider_ids = {rider_id for _, ids in partition for rider_id in ids}
+        manual_pairs = {pair for pair in context.manual_pairs if pair[1] in rider_ids}
+        carried: Rotations = {}
+        if rotations is not None:
+            carried = {
+                store_id: rotations[store_id]
+                for store_id, _ in partition
+                if store_id in rotations
+            }
+        absent_by_date = {}
+        for day, absent in context.absent_by_date.items():
+            partition_absent = absent & rider_ids
+            if partition_absent:
+                absent_by_date[day] = partition_absent
+        jobs.append(
+            (partition, schedule_dates, manual_pairs, carried, absent_by_date, engine, deadline)
+        )
+    result = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        for partial, carried in executor.map(_plan_store_partition_job, jobs):
+            result.update(partial)
+            if rotations is not None:
+                rotations.update(carried)
+    return result
+
+
+def plan_external_day(context: SchedulingContext, shift_date: date) -> List[PlannedShift]:
+    """Round-robin the TC/FDS pool over the external brands for one day"""
+    day_pool = (
+        context.external_pool_weekend
+        if shift_date.weekday() >= 5
+        else context.external_pool_weekday
+    )
+    unavailable = context.manual_riders_by_date.get(shift_date, set()) | (
+        context.absent_by_date.get(shift_date, set())
+    )
+    if unavailable:
+        available = deque(r for r in day_pool if r.id not in unavailable)
+    else:
+        available = deque(day_pool)
+    plan: List[PlannedShift] = []
+    for brand in context.external_brands:
+        if not available:
+            break
+        rider = available.popleft()
+        plan.append(PlannedShift(rider.id, None, brand.id, shift_date, "EXTERNO"))
+    for rider in available:
+        plan.append(PlannedShift(rider.id, None, None, shift_date, "DISPONIBLE"))
+    return plan
+
+
+# The rows do not depend on the worker count, and chunks sharing ``rotations`` (and,
+# for flow, one ``deadline``) match a single run.
+def plan_schedule(
+    context: SchedulingContext,
+    workers: int = 1,
+    partition_by: str = "zone",
+    schedule_dates: Optional[List[date]] = None,
+    rotations: Optional[Rotations] = None,
+    engine: str = DEFAULT_ENGINE,
+    deadline: Optional[float] = None,
+) -> List[PlannedShift]:
+    """Compute the plan for the context horizon or a run of its dates"""
+    if not context.riders:
+        return []
+    if schedule_dates is None:
+        schedule_dates = context.schedule_dates
+    if engine == "flow" and deadline is None:
+        from app.services.optimal import solver_deadline
+
+        deadline = solver_deadline()
+    with span("store_pass") as phase:
+        store_plans = plan_store_pass(
+            context, workers, partition_by, schedule_dates, rotations, engine, deadline
+        )
+        ordered_plans = [
+            store_plans[store.id] for store in context.stores if store.id in store_plans
+        ]
+        phase.rows = sum(len(day) for per_day in ordered_plans for day in per_day)
+    with span("external_pass") as phase:
+        if engine == "flow":
+            from app.services.optimal import plan_external_days_optimal
+
+            external_plans = plan_external_days_optimal(context, schedule_dates, deadline)
+        else:
+            external_plans = [plan_external_day(context, day) for day in schedule_dates]
+        phase.rows = sum(len(day) for day in external_plans)
+    plan: List[PlannedShift] = []
+    for day_offset, shift_date in enumerate(schedule_dates):
+        for per_day in ordered_plans:
+            plan.extend(per_day[day_offset])
+        plan.extend(external_plans[day_offset])
+    if engine == "flow":
+        _record_fairness(context, plan, deadline)
+    return plan
+
+
+def _record_fairness(context: SchedulingContext, plan: List[PlannedShift], deadline: float) -> None:
+    """Add the flow solver's fairness spread and budget use to the current trace"""
+    from app.services.optimal import fairness_spread
+
+    with span("fairness") as phase:
+        phase.detail = fairness_spread(context, plan)
+        phase.detail["over_budget"] = int(time.monotonic() > deadline)
+
+
+def build_assignments(
+    context: SchedulingContext,
+    workers: int = 1,
+    partition_by: str = "zone",
+    engine: str = DEFAULT_ENGINE,
+) -> List[ScheduleAssignment]:
+    """Compute the plan and wrap it in ORM objects"""
+    return [
+        ScheduleAssignment(**shift._asdict())
+        for shift in plan_schedule(context, workers, partition_by, engine=engine)
+    ]
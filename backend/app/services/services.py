@@ -1,10 +1,50 @@
+import itertools
+import os
+
+from sqlalchemy import Date, and_, case, exists, func, literal, or_, select, true
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from app.models.models import PanpayaStore, Rider, ExternalBrand, ScheduleAssignment
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from app.models.models import (
+    PanpayaStore,
+    Rider,
+    RiderAbsence,
+    ExternalBrand,
+    ScheduleAssignment,
+)
 from app.schemas import schemas
+from app.services.absences import observation_reason
+from app.services.scheduling import (
+    DEFAULT_ENGINE,
+    DEFAULT_PARTITION,
+    DEFAULT_WORKERS,
+    PlannedShift,
+    Rotations,
+    SchedulingContext,
+    _partition_planner,
+    plan_external_day,
+    plan_schedule,
+)
+from app.services.invalidation import invalidations
+from app.services.locking import generation_flight, lock_range
+from app.services.preview import (
+    PreviewEntry,
+    StalePreviewError,
+    fingerprint,
+    preview_cache,
+)
+from app.services.persistence import reconcile_generated, replace_generated
+from app.services.records import BrandRecord, RiderRecord, StoreRecord
+from app.services.reference import reference_cache
+from app.services.tracing import span
+from app.services.versions import versions
+from collections import Counter
 from datetime import date, timedelta
 
 
+# Rows fetched per server-side batch when streaming the schedule listing
+DEFAULT_STREAM_BATCH = int(os.getenv("SCHEDULE_STREAM_BATCH", "1000"))
+
+
 # Panpaya Store services
 def get_store(db: Session, store_id: int) -> Optional[PanpayaStore]:
     """Get a single store by ID"""
@@ -27,6 +67,7 @@ def create_store(db: Session, store: schemas.PanpayaStoreCreate) -> PanpayaStore
     db.add(db_store)
     db.commit()
     db.refresh(db_store)
+    versions.bump("stores")
     return db_store
 
 
@@ -44,6 +85,7 @@ def update_store(
     
     db.commit()
     db.refresh(db_store)
+    versions.bump("stores")
     return db_store
 
 
@@ -55,6 +97,8 @@ def delete_store(db: Session, store_id: int) -> bool:
     
     db.delete(db_store)
     db.commit()
+    invalidations.store(store_id)
+    versions.bump("stores")
     return True
 
 
@@ -78,8 +122,12 @@ def create_rider(db: Session, rider: schemas.RiderCreate) -> Rider:
     """Create a new rider"""
     db_rider = Rider(**rider.model_dump())
     db.add(db_rider)
+    db.flush()
+    sync_observation_absence(db, db_rider)
     db.commit()
     db.refresh(db_rider)
+    invalidations.rider(db_rider.rider_type, db_rider.store_id)
+    versions.bump("riders")
     return db_rider
 
 
@@ -90,13 +138,18 @@ def update_rider(
     db_rider = get_rider(db, rider_id)
     if db_rider is None:
         return None
+    invalidations.rider(db_rider.rider_type, db_rider.store_id)
     
     update_data = rider.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_rider, field, value)
+    if "observation" in update_data:
+        sync_observation_absence(db, db_rider)
     
     db.commit()
     db.refresh(db_rider)
+    invalidations.rider(db_rider.rider_type, db_rider.store_id)
+    versions.bump("riders")
     return db_rider
 
 
@@ -105,12 +158,76 @@ def delete_rider(db: Session, rider_id: int) -> bool:
     db_rider = get_rider(db, rider_id)
     if db_rider is None:
         return False
+    invalidations.rider(db_rider.rider_type, db_rider.store_id)
     
+    db.query(RiderAbsence).filter(RiderAbsence.rider_id == rider_id).delete()
     db.delete(db_rider)
     db.commit()
+    versions.bump("riders")
+    return True
+
+
+# Rider absence services
+def get_rider_absences(db: Session, rider_id: int) -> List[RiderAbsence]:
+    """Get the absence periods of a rider"""
+    return (
+        db.query(RiderAbsence)
+        .filter(RiderAbsence.rider_id == rider_id)
+        .order_by(RiderAbsence.start_date, RiderAbsence.id)
+        .all()
+    )
+
+
+def create_rider_absence(
+    db: Session, rider: Rider, absence: schemas.RiderAbsenceCreate
+) -> RiderAbsence:
+    """Register an absence period for a rider"""
+    db_absence = RiderAbsence(rider_id=rider.id, **absence.model_dump())
+    db.add(db_absence)
+    db.commit()
+    db.refresh(db_absence)
+    invalidations.rider(rider.rider_type, rider.store_id)
+    return db_absence
+
+
+def delete_rider_absence(db: Session, rider: Rider, absence_id: int) -> bool:
+    """Delete an absence period of a rider"""
+    db_absence = (
+        db.query(RiderAbsence)
+        .filter(RiderAbsence.id == absence_id, RiderAbsence.rider_id == rider.id)
+        .first()
+    )
+    if db_absence is None:
+        return False
+    db.delete(db_absence)
+    db.commit()
+    invalidations.rider(rider.rider_type, rider.store_id)
     return True
 
 
+def sync_observation_absence(db: Session, rider: Rider) -> None:
+    """Mirror an absence keyword in the observation as an OBSERVATION absence"""
+    reason = observation_reason(rider.observation)
+    derived = (
+        db.query(RiderAbsence)
+        .filter(RiderAbsence.rider_id == rider.id, RiderAbsence.source == "OBSERVATION")
+        .all()
+    )
+    if reason is None:
+        for absence in derived:
+            db.delete(absence)
+        return
+    if not derived:
+        db.add(
+            RiderAbsence(
+                rider_id=rider.id, reason=reason, notes=rider.observation, source="OBSERVATION"
+            )
+        )
+        return
+    derived[0].reason = reason
+    derived[0].notes = rider.observation
+
+
 # External brand services
 def get_external_brand(db: Session, brand_id: int) -> Optional[ExternalBrand]:
     return db.query(ExternalBrand).filter(ExternalBrand.id == brand_id).first()
@@ -125,6 +242,8 @@ def create_external_brand(db: Session, brand: schemas.ExternalBrandCreate) -> Ex
     db.add(db_brand)
     db.commit()
     db.refresh(db_brand)
+    invalidations.external()
+    versions.bump("brands")
     return db_brand
 
 
@@ -139,6 +258,8 @@ def update_external_brand(
         setattr(db_brand, field, value)
     db.commit()
     db.refresh(db_brand)
+    invalidations.external()
+    versions.bump("brands")
     return db_brand
 
 
@@ -148,6 +269,8 @@ def delete_external_brand(db: Session, brand_id: int) -> bool:
         return False
     db.delete(db_brand)
     db.commit()
+    invalidations.external()
+    versions.bump("brands")
     return True
 
 
@@ -169,6 +292,283 @@ def list_schedule_assignments(
     )
 
 
+_ASSIGNMENT_COLUMNS = (
+    ScheduleAssignment.id,
+    ScheduleAssignment.rider_id,
+    ScheduleAssignment.store_id,
+    ScheduleAssignment.external_brand_id,
+    ScheduleAssignment.shift_date,
+    ScheduleAssignment.shift_type,
+    ScheduleAssignment.start_time,
+    ScheduleAssignment.end_time,
+    ScheduleAssignment.manual_override,
+    ScheduleAssignment.notes,
+)
+
+
+def schedule_rows_query(
+    start_date: date,
+    end_date: date,
+    store_id: Optional[int] = None,
+    rider_id: Optional[int] = None,
+    external_brand_id: Optional[int] = None,
+    shift_type: Optional[str] = None,
+    zone: Optional[str] = None,
+    manual_override: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    limit: Optional[int] = None,
+):
+    """Column-projected listing query ordered by (shift_date, id), resuming after ``after``"""
+    query = (
+        select(
+            *_ASSIGNMENT_COLUMNS,
+            *RiderRecord.columns,
+            *StoreRecord.columns,
+            *BrandRecord.columns,
+        )
+        .select_from(ScheduleAssignment)
+        .outerjoin(Rider, Rider.id == ScheduleAssignment.rider_id)
+        .outerjoin(PanpayaStore, PanpayaStore.id == ScheduleAssignment.store_id)
+        .outerjoin(ExternalBrand, ExternalBrand.id == ScheduleAssignment.external_brand_id)
+        .where(ScheduleAssignment.shift_date >= start_date)
+        .where(ScheduleAssignment.shift_date <= end_date)
+    )
+    if store_id is not None:
+        query = query.where(ScheduleAssignment.store_id == store_id)
+    if rider_id is not None:
+        query = query.where(ScheduleAssignment.rider_id == rider_id)
+    if external_brand_id is not None:
+        query = query.where(ScheduleAssignment.external_brand_id == external_brand_id)
+    if shift_type is not None:
+        query = query.where(ScheduleAssignment.shift_type == shift_type)
+    if zone is not None:
+        query = query.where(PanpayaStore.zone == zone)
+    if manual_override is not None:
+        query = query.where(ScheduleAssignment.manual_override.is_(manual_override))
+    if after is not None:
+        after_date, after_id = after
+        query = query.where(
+            or_(
+                ScheduleAssignment.shift_date > after_date,
+                and_(
+                    ScheduleAssignment.shift_date == after_date,
+                    ScheduleAssignment.id > after_id,
+                ),
+            )
+        )
+    query = query.order_by(ScheduleAssignment.shift_date.asc(), ScheduleAssignment.id.asc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+class DetailRowBuilder:
+    """Turns ``schedule_rows_query`` tuples into JSON-ready detail dicts"""
+
+    assignment_keys = [column.key for column in _ASSIGNMENT_COLUMNS]
+    rider_keys = [column.key for column in RiderRecord.columns]
+    store_keys = [column.key for column in StoreRecord.columns]
+    brand_keys = [column.key for column in BrandRecord.columns]
+
+    def __init__(self):
+        self.riders: Dict[int, dict] = {}
+        self.stores: Dict[int, dict] = {}
+        self.brands: Dict[int, dict] = {}
+        self.dates: Dict[date, str] = {}
+        self._rider_start = len(self.assignment_keys)
+        self._store_start = self._rider_start + len(self.rider_keys)
+        self._brand_start = self._store_start + len(self.store_keys)
+
+    def __call__(self, values: Tuple) -> dict:
+        row = dict(zip(self.assignment_keys, values))
+        shift_date = row["shift_date"]
+        if shift_date not in self.dates:
+            self.dates[shift_date] = shift_date.isoformat()
+        row["shift_date"] = self.dates[shift_date]
+        rider = self.riders.get(row["rider_id"])
+        if rider is None and values[self._rider_start] is not None:
+            rider = self.riders[row["rider_id"]] = dict(
+                zip(self.rider_keys, values[self._rider_start : self._store_start])
+            )
+        row["rider"] = rider
+        store = self.stores.get(row["store_id"])
+        if store is None and values[self._store_start] is not None:
+            store = self.stores[row["store_id"]] = dict(
+                zip(self.store_keys, values[self._store_start : self._brand_start])
+            )
+        row["store"] = store
+        brand = self.brands.get(row["external_brand_id"])
+        if brand is None and values[self._brand_start] is not None:
+            brand = self.brands[row["external_brand_id"]] = dict(
+                zip(self.brand_keys, values[self._brand_start :])
+            )
+        row["external_brand"] = brand
+        return row
+
+    def from_records(self, assignment: Dict[str, Any], rider: Any, store: Any, brand: Any) -> dict:
+        """Build a row from assignment values and rider, store and brand objects"""
+        values = [assignment.get(key) for key in self.assignment_keys]
+        related = ((rider, self.rider_keys), (store, self.store_keys), (brand, self.brand_keys))
+        for record, keys in related:
+            if record is None:
+                values.extend([None] * len(keys))
+            else:
+                values.extend(getattr(record, key) for key in keys)
+        return self(tuple(values))
+
+
+def list_schedule_rows(
+    db: Session, start_date: date, end_date: date, **filters: Any
+) -> List[dict]:
+    """``ScheduleAssignmentDetail`` payloads from one column-projected query"""
+    build = DetailRowBuilder()
+    return [
+        build(values)
+        for values in db.execute(schedule_rows_query(start_date, end_date, **filters))
+    ]
+
+
+def iter_schedule_rows(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    batch_size: int = DEFAULT_STREAM_BATCH,
+    **filters: Any,
+) -> Iterator[dict]:
+    """``list_schedule_rows`` as a generator over a server-side cursor"""
+    build = DetailRowBuilder()
+    result = db.execute(
+        schedule_rows_query(start_date, end_date, **filters),
+        execution_options={"yield_per": batch_size},
+    )
+    try:
+        for values in result:
+            yield build(values)
+    finally:
+        result.close()
+
+
+def _week_start(dialect_name: str):
+    """Monday of the ISO week of ``shift_date``, as a SQL expression"""
+    shift_date = ScheduleAssignment.shift_date
+    if dialect_name == "sqlite":
+        # Forward to Sunday (or stay on it), then back to its Monday
+        return func.date(shift_date, "weekday 0", "-6 days", type_=Date)
+    if dialect_name == "mysql":
+        return func.subdate(shift_date, func.weekday(shift_date), type_=Date)
+    return func.date_trunc("week", shift_date, type_=Date)
+
+
+# group_by name -> (result key, column); zone needs the store join
+STATS_GROUPS = {
+    "rider": ("rider_id", ScheduleAssignment.rider_id),
+    "store": ("store_id", ScheduleAssignment.store_id),
+    "brand": ("external_brand_id", ScheduleAssignment.external_brand_id),
+    "zone": ("zone", PanpayaStore.zone),
+    "shift_type": ("shift_type", ScheduleAssignment.shift_type),
+    "week": ("week_start", None),
+}
+
+
+def _counted(condition) -> Any:
+    return func.sum(case((condition, 1), else_=0))
+
+
+def schedule_stats(
+    db: Session, start_date: date, end_date: date, group_by: List[str]
+) -> List[dict]:
+    """Shift totals of a range grouped in the database"""
+    shift_type = ScheduleAssignment.shift_type
+    keys = []
+    for name in group_by:
+        key, column = STATS_GROUPS[name]
+        if column is None:
+            column = _week_start(db.get_bind().dialect.name)
+        keys.append(column.label(key))
+    query = select(
+        *keys,
+        func.count().label("assignments"),
+        _counted(shift_type == "AM").label("am"),
+        _counted(shift_type == "PM").label("pm"),
+        _counted(func.upper(shift_type) == "AM Y PM").label("doubles"),
+        _counted(shift_type == "DESCANSO").label("rest"),
+        _counted(shift_type == "EXTERNO").label("external"),
+        _counted(shift_type == "DISPONIBLE").label("available"),
+        _counted(ScheduleAssignment.manual_override.is_(True)).label("manual"),
+        func.count(ScheduleAssignment.shift_date.distinct()).label("days"),
+    ).select_from(ScheduleAssignment)
+    if "zone" in group_by:
+        query = query.outerjoin(PanpayaStore, PanpayaStore.id == ScheduleAssignment.store_id)
+    query = (
+        query.where(ScheduleAssignment.shift_date >= start_date)
+        .where(ScheduleAssignment.shift_date <= end_date)
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def _date_series(dialect_name: str, start_date: date, end_date: date):
+    """Recursive CTE with one ``shift_date`` row per day of the range"""
+    if dialect_name == "sqlite":
+        # SQLite keeps dates as ISO text; a CAST would turn them into numbers
+        anchor = literal(start_date, Date)
+    else:
+        anchor = literal(start_date).cast(Date)
+    days = select(anchor.label("shift_date")).cte("days", recursive=True)
+    if dialect_name == "sqlite":
+        following = func.date(days.c.shift_date, "+1 day", type_=Date)
+    elif dialect_name == "mysql":
+        following = func.adddate(days.c.shift_date, 1, type_=Date)
+    else:
+        following = days.c.shift_date + 1
+    return days.union_all(
+        select(following).where(days.c.shift_date < end_date)
+    )
+
+
+def unassigned_riders(db: Session, start_date: date, end_date: date) -> Dict[date, List[int]]:
+    """Active riders without any assignment, per date, from one anti-join"""
+    if end_date < start_date:
+        return {}
+    days = _date_series(db.get_bind().dialect.name, start_date, end_date)
+    assigned = exists().where(
+        ScheduleAssignment.rider_id == Rider.id,
+        ScheduleAssignment.shift_date == days.c.shift_date,
+    )
+    query = (
+        select(days.c.shift_date, Rider.id)
+        .select_from(days)
+        .join(Rider, true())
+        .where(Rider.active.is_(True))
+        .where(~assigned)
+        .order_by(days.c.shift_date, Rider.id)
+    )
+    unassigned: Dict[date, List[int]] = {
+        start_date + timedelta(days=offset): []
+        for offset in range((end_date - start_date).days + 1)
+    }
+    for shift_date, rider_id in db.execute(query):
+        unassigned[shift_date].append(rider_id)
+    return unassigned
+
+
+def schedule_dashboard(db: Session, start_date: date, end_date: date) -> Dict[str, Any]:
+    """``ScheduleDashboardResponse`` payload, JSON-ready like the listing rows"""
+    by_date = unassigned_riders(db, start_date, end_date)
+    days_out = Counter(rider_id for rider_ids in by_date.values() for rider_id in rider_ids)
+    return {
+        "assignments": list_schedule_rows(db, start_date, end_date),
+        "unassigned": sorted(
+            rider_id for rider_id, days in days_out.items() if days == len(by_date)
+        ),
+        "unassigned_by_date": [
+            {"shift_date": shift_date.isoformat(), "rider_ids": rider_ids}
+            for shift_date, rider_ids in by_date.items()
+        ],
+    }
+
+
 def create_schedule_assignment(
     db: Session, assignment: schemas.ScheduleAssignmentCreate
 ) -> ScheduleAssignment:
@@ -176,6 +576,8 @@ def create_schedule_assignment(
     db.add(db_assignment)
     db.commit()
     db.refresh(db_assignment)
+    _invalidate_assignment(db, db_assignment)
+    versions.bump_schedule(db_assignment.shift_date)
     return db_assignment
 
 
@@ -194,6 +596,8 @@ def update_schedule_assignment(
         setattr(db_assignment, field, value)
     db.commit()
     db.refresh(db_assignment)
+    _invalidate_assignment(db, db_assignment)
+    versions.bump_schedule(db_assignment.shift_date)
     return db_assignment
 
 
@@ -205,188 +609,359 @@ def delete_schedule_assignment(db: Session, assignment_id: int) -> bool:
     )
     if db_assignment is None:
         return False
+    _invalidate_assignment(db, db_assignment)
+    shift_date = db_assignment.shift_date
     db.delete(db_assignment)
     db.commit()
+    versions.bump_schedule(shift_date)
     return True
 
 
-def generate_schedule(db: Session, start_date: date, days: int) -> List[ScheduleAssignment]:
-    riders = db.query(Rider).filter(Rider.active.is_(True)).all()
-    stores = db.query(PanpayaStore).all()
-    external_brands = db.query(ExternalBrand).order_by(ExternalBrand.name.asc()).all()
-    if not riders:
-        return []
-    assignments: List[ScheduleAssignment] = []
-    schedule_dates = [start_date + timedelta(days=offset) for offset in range(days)]
-    ppy_riders = [r for r in riders if r.rider_type.upper() == "PANPAYA"]
-    tc_riders = [r for r in riders if r.rider_type.upper() in ("TC", "TIEMPO_COMPLETO")]
-    fds_riders = [r for r in riders if r.rider_type.upper() in ("FDS", "FIN_DE_SEMANA")]
-    if not tc_riders:
-        tc_riders = [r for r in riders if r.rider_type.upper() == "EXTERNO"]
-    counters = {r.id: {"am": 0, "pm": 0, "double": 0, "rest": 0} for r in riders}
-    per_day_pool: dict[date, List[Rider]] = {}
-    existing_manual = (
-        db.query(ScheduleAssignment)
-        .filter(ScheduleAssignment.manual_override.is_(True))
-        .filter(ScheduleAssignment.shift_date >= start_date)
-        .filter(ScheduleAssignment.shift_date < start_date + timedelta(days=days))
-        .all()
+def _invalidate_assignment(db: Session, assignment: ScheduleAssignment) -> None:
+    # Inactive riders are not cached; they still invalidate their slice
+    rider = reference_cache.riders(db).by_id.get(assignment.rider_id) or get_rider(
+        db, assignment.rider_id
     )
-    manual_pairs = {(item.shift_date, item.rider_id) for item in existing_manual}
-    for shift_date in schedule_dates:
-        day_index = shift_date.weekday()
-        for store in stores:
-            store_riders = [r for r in ppy_riders if r.store_id == store.id]
-            if not store_riders:
-                continue
-            eligible = [r for r in store_riders if not _is_exception(r)]
-            if not eligible:
-                continue
-            if day_index % 2 == 0:
-                am_rider = min(eligible, key=lambda r: counters[r.id]["am"])
-                pm_rider = min(eligible, key=lambda r: counters[r.id]["pm"])
-                if am_rider.id == pm_rider.id:
-                    if (shift_date, am_rider.id) in manual_pairs:
-                        continue
-                    assignments.append(
-                        ScheduleAssignment(
-                            rider_id=am_rider.id,
-                            store_id=store.id,
-                            shift_date=shift_date,
-                            shift_type="AM Y PM",
-                        )
-                    )
-                    counters[am_rider.id]["double"] += 1
-                else:
-                    if (shift_date, am_rider.id) not in manual_pairs:
-                        assignments.append(
-                            ScheduleAssignment(
-                                rider_id=am_rider.id,
-                                store_id=store.id,
-                                shift_date=shift_date,
-                                shift_type="AM",
-                            )
-                        )
-                        counters[am_rider.id]["am"] += 1
-                    if (shift_date, pm_rider.id) not in manual_pairs:
-                        assignments.append(
-                            ScheduleAssignment(
-                                rider_id=pm_rider.id,
-                                store_id=store.id,
-                                shift_date=shift_date,
-                                shift_type="PM",
-                            )
-                        )
-                        counters[pm_rider.id]["pm"] += 1
-            else:
-                rest_rider = min(eligible, key=lambda r: counters[r.id]["rest"])
-                if (shift_date, rest_rider.id) not in manual_pairs:
-                    assignments.append(
-                        ScheduleAssignment(
-                            rider_id=rest_rider.id,
-                            store_id=store.id,
-                            shift_date=shift_date,
-                            shift_type="DESCANSO",
-                        )
-                    )
-                    counters[rest_rider.id]["rest"] += 1
-                active_riders = [r for r in eligible if r.id != rest_rider.id]
-                if active_riders:
-                    am_rider = min(active_riders, key=lambda r: counters[r.id]["am"])
-                    pm_rider = min(active_riders, key=lambda r: counters[r.id]["pm"])
-                    if am_rider.id == pm_rider.id:
-                        if (shift_date, am_rider.id) in manual_pairs:
-                            continue
-                        assignments.append(
-                            ScheduleAssignment(
-                                rider_id=am_rider.id,
-                                store_id=store.id,
-                                shift_date=shift_date,
-                                shift_type="AM Y PM",
-                            )
-                        )
-                        counters[am_rider.id]["double"] += 1
-                    else:
-                        if (shift_date, am_rider.id) not in manual_pairs:
-                            assignments.append(
-                                ScheduleAssignment(
-                                    rider_id=am_rider.id,
-                                    store_id=store.id,
-                                    shift_date=shift_date,
-                                    shift_type="AM",
-                                )
-                            )
-                            counters[am_rider.id]["am"] += 1
-                        if (shift_date, pm_rider.id) not in manual_pairs:
-                            assignments.append(
-                                ScheduleAssignment(
-                                    rider_id=pm_rider.id,
-                                    store_id=store.id,
-                                    shift_date=shift_date,
-                                    shift_type="PM",
-                                )
-                            )
-                            counters[pm_rider.id]["pm"] += 1
-        pool = per_day_pool.get(shift_date)
-        if pool is None:
-            pool = tc_riders + fds_riders
-            per_day_pool[shift_date] = pool
-        assigned_external = set()
-        for brand in external_brands:
-            available_riders = [
-                r
-                for r in pool
-                if r.id not in assigned_external
-                and not _is_exception(r)
-                and (shift_date, r.id) not in manual_pairs
-                and not (r in fds_riders and day_index < 5)
-            ]
-            if not available_riders:
-                break
-            rider = available_riders[0]
-            assigned_external.add(rider.id)
-            assignments.append(
-                ScheduleAssignment(
-                    rider_id=rider.id,
-                    external_brand_id=brand.id,
-                    shift_date=shift_date,
-                    shift_type="EXTERNO",
-                )
+    if rider is not None:
+        invalidations.rider(rider.rider_type, rider.store_id, assignment.shift_date)
+
+
+def generate_schedule(
+    db: Session,
+    start_date: date,
+    days: int,
+    workers: Optional[int] = None,
+    partition_by: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+) -> List[dict]:
+    """Generate a range and return its assignments as detail rows"""
+    return generation_flight.do(
+        ("generate", start_date, days),
+        lambda: _generate_range(db, start_date, days, workers, partition_by, chunk_size),
+    )
+
+
+def _columns(instance: Any) -> Dict[str, Any]:
+    return {column.key: getattr(instance, column.key) for column in instance.__table__.columns}
+
+
+def _detail_rows(
+    context: SchedulingContext, plan: List[PlannedShift], ids: Optional[List[int]] = None
+) -> List[dict]:
+    """Detail payloads for the manual overrides and a plan, from the context maps"""
+    build = DetailRowBuilder()
+    rows = []
+    for item in context.manual_assignments:
+        # Manual overrides may point at inactive riders outside the context
+        rows.append(
+            build.from_records(
+                _columns(item),
+                context.riders_by_id.get(item.rider_id, item.rider),
+                context.stores_by_id.get(item.store_id),
+                context.brands_by_id.get(item.external_brand_id),
             )
-            counters[rider.id]["am"] += 1
-            pool.append(pool.pop(pool.index(rider)))
-        for rider in pool:
-            if _is_exception(rider):
-                continue
-            if rider in fds_riders and day_index < 5:
-                continue
-            if rider.id in assigned_external:
-                continue
-            if (shift_date, rider.id) in manual_pairs:
-                continue
-            assignments.append(
-                ScheduleAssignment(
-                    rider_id=rider.id,
-                    shift_date=shift_date,
-                    shift_type="DISPONIBLE",
-                )
+        )
+    for row_id, shift in zip(ids if ids is not None else itertools.repeat(None), plan):
+        rows.append(
+            build.from_records(
+                dict(shift._asdict(), id=row_id, manual_override=False),
+                context.riders_by_id.get(shift.rider_id),
+                context.stores_by_id.get(shift.store_id),
+                context.brands_by_id.get(shift.external_brand_id),
             )
-    db.query(ScheduleAssignment).filter(
-        ScheduleAssignment.shift_date >= start_date,
-        ScheduleAssignment.shift_date < start_date + timedelta(days=days),
-        ScheduleAssignment.manual_override.is_(False),
-    ).delete(synchronize_session=False)
-    for assignment in assignments:
-        db.add(assignment)
-    db.commit()
-    return list_schedule_assignments(
-        db, start_date, start_date + timedelta(days=days - 1)
+        )
+    rows.sort(key=lambda row: row["shift_date"])
+    return rows
+
+
+def _solver_deadline() -> Optional[float]:
+    """One budget for every pass of a run under the flow engine"""
+    if DEFAULT_ENGINE != "flow":
+        return None
+    from app.services.optimal import solver_deadline
+
+    return solver_deadline()
+
+
+def _generate_range(
+    db: Session,
+    start_date: date,
+    days: int,
+    workers: Optional[int],
+    partition_by: Optional[str],
+    chunk_size: Optional[int],
+) -> List[dict]:
+    end_date = start_date + timedelta(days=days - 1)
+    # Consumed before the load, so a write committed meanwhile stays pending
+    stores, dates = invalidations.consume(start_date, end_date)
+    try:
+        with span("lock"):
+            lock_range(db, start_date, end_date)
+        with span("load") as phase:
+            context = SchedulingContext.load(db, start_date, days)
+            phase.rows = len(context.riders)
+        if not context.riders:
+            db.rollback()
+            invalidations.restore(stores, dates, start_date, end_date)
+            return []
+        plan = plan_schedule(
+            context,
+            workers=workers or DEFAULT_WORKERS,
+            partition_by=partition_by or DEFAULT_PARTITION,
+        )
+        ids: List[int] = []
+        replace_generated(db, plan, start_date, days, chunk_size, ids)
+        with span("detail") as phase:
+            rows = _detail_rows(context, plan, ids)
+            phase.rows = len(rows)
+        with span("commit"):
+            db.commit()
+    except Exception:
+        db.rollback()
+        invalidations.restore(stores, dates, start_date, end_date)
+        raise
+    versions.bump_schedule(start_date, end_date)
+    return rows
+
+
+def generate_schedule_horizon(
+    db: Session,
+    start_date: date,
+    days: int,
+    chunk_days: int = 7,
+    workers: Optional[int] = None,
+    partition_by: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[str, Any]:
+    """Generate a long horizon chunk by chunk, committing after each one"""
+    end_date = start_date + timedelta(days=days - 1)
+    stores, dates = invalidations.consume(start_date, end_date)
+    summary: Dict[str, Any] = {
+        "start_date": start_date,
+        "days": days,
+        "chunks": 0,
+        "assignments": 0,
+    }
+    try:
+        context = SchedulingContext.load(db, start_date, days)
+        if not context.riders:
+            invalidations.restore(stores, dates, start_date, end_date)
+            return summary
+        rotations: Rotations = {}
+        store_days = 0
+        deadline = _solver_deadline()
+        for offset in range(0, days, chunk_days):
+            chunk_dates = context.schedule_dates[offset : offset + chunk_days]
+            plan = plan_schedule(
+                context,
+                workers=workers or DEFAULT_WORKERS,
+                partition_by=partition_by or DEFAULT_PARTITION,
+                schedule_dates=chunk_dates,
+                rotations=rotations,
+                deadline=deadline,
+            )
+            lock_range(db, chunk_dates[0], chunk_dates[-1])
+            summary["assignments"] += replace_generated(
+                db, plan, chunk_dates[0], len(chunk_dates), chunk_size
+            )
+            db.commit()
+            versions.bump_schedule(chunk_dates[0], chunk_dates[-1])
+            summary["chunks"] += 1
+            store_days += len(
+                {(shift.store_id, shift.shift_date) for shift in plan if shift.store_id is not None}
+            )
+            if progress is not None:
+                progress(
+                    {
+                        "days_done": offset + len(chunk_dates),
+                        "days": days,
+                        "stores_done": store_days,
+                        "assignments": summary["assignments"],
+                    }
+                )
+    except Exception:
+        db.rollback()
+        invalidations.restore(stores, dates, start_date, end_date)
+        raise
+    return summary
+
+
+def reconcile_schedule(
+    db: Session,
+    start_date: date,
+    days: int,
+    workers: Optional[int] = None,
+    partition_by: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """Regenerate a range writing only the rows that actually changed"""
+    return generation_flight.do(
+        ("reconcile", start_date, days),
+        lambda: _reconcile_range(db, start_date, days, workers, partition_by, chunk_size),
     )
 
 
-def _is_exception(rider: Rider) -> bool:
-    if not rider.observation:
-        return False
-    observation = rider.observation.upper()
-    keywords = ["VACACIONES", "INCAPACIDAD", "LICENCIA", "PERMISO"]
-    return any(keyword in observation for keyword in keywords)
+def _reconcile_range(
+    db: Session,
+    start_date: date,
+    days: int,
+    workers: Optional[int],
+    partition_by: Optional[str],
+    chunk_size: Optional[int],
+) -> Dict[str, int]:
+    end_date = start_date + timedelta(days=days - 1)
+    stores, dates = invalidations.consume(start_date, end_date)
+    try:
+        with span("lock"):
+            lock_range(db, start_date, end_date)
+        with span("load") as phase:
+            context = SchedulingContext.load(db, start_date, days)
+            phase.rows = len(context.riders)
+        if not context.riders:
+            db.rollback()
+            invalidations.restore(stores, dates, start_date, end_date)
+            return {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        plan = plan_schedule(
+            context,
+            workers=workers or DEFAULT_WORKERS,
+            partition_by=partition_by or DEFAULT_PARTITION,
+        )
+        with span("reconcile") as phase:
+            counts = reconcile_generated(db, plan, start_date, days, chunk_size)
+            phase.rows = counts["inserted"] + counts["updated"] + counts["deleted"]
+        with span("commit"):
+            db.commit()
+    except Exception:
+        db.rollback()
+        invalidations.restore(stores, dates, start_date, end_date)
+        raise
+    versions.bump_schedule(start_date, end_date)
+    return counts
+
+
+def preview_schedule(
+    db: Session,
+    start_date: date,
+    days: int,
+    workers: Optional[int] = None,
+    partition_by: Optional[str] = None,
+) -> dict:
+    """Compute a plan without writing it, reusing a cached one when the inputs match"""
+    context = SchedulingContext.load(db, start_date, days)
+    key = fingerprint(context)
+    entry = preview_cache.get(key)
+    cached = entry is not None
+    if entry is None:
+        plan = []
+        if context.riders:
+            plan = plan_schedule(
+                context,
+                workers=workers or DEFAULT_WORKERS,
+                partition_by=partition_by or DEFAULT_PARTITION,
+            )
+        entry = PreviewEntry(start_date, days, plan)
+        preview_cache.put(key, entry)
+    return {
+        "fingerprint": key,
+        "start_date": start_date,
+        "days": days,
+        "cached": cached,
+        "assignments": _detail_rows(context, entry.plan),
+    }
+
+
+def commit_preview(
+    db: Session, key: str, chunk_size: Optional[int] = None
+) -> Optional[List[dict]]:
+    """Persist a cached preview; None if unknown, StalePreviewError if stale"""
+    entry = preview_cache.get(key)
+    if entry is None:
+        return None
+    end_date = entry.start_date + timedelta(days=entry.days - 1)
+    stores, dates = invalidations.consume(entry.start_date, end_date)
+    try:
+        lock_range(db, entry.start_date, end_date)
+        context = SchedulingContext.load(db, entry.start_date, entry.days)
+        if fingerprint(context) != key:
+            preview_cache.pop(key)
+            raise StalePreviewError(key)
+        if not context.riders:
+            db.rollback()
+            invalidations.restore(stores, dates, entry.start_date, end_date)
+            return []
+        ids: List[int] = []
+        replace_generated(db, entry.plan, entry.start_date, entry.days, chunk_size, ids)
+        rows = _detail_rows(context, entry.plan, ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        invalidations.restore(stores, dates, entry.start_date, end_date)
+        raise
+    versions.bump_schedule(entry.start_date, end_date)
+    return rows
+
+
+# A stale store is replanned over the whole range: its counters depend on every
+# earlier day.
+def regenerate_invalidated(
+    db: Session,
+    start_date: date,
+    days: int,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """Regenerate only the slices invalidated since the last regeneration"""
+    end_date = start_date + timedelta(days=days - 1)
+    stores, dates = invalidations.consume(start_date, end_date)
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    if not stores and not dates:
+        counts.update(stores=0, dates=0)
+        return counts
+    try:
+        lock_range(db, start_date, end_date)
+        context = SchedulingContext.load(db, start_date, days)
+        partition = [
+            (store.id, [r.id for r in context.eligible_by_store[store.id]])
+            for store in context.stores
+            if store.id in stores and context.eligible_by_store.get(store.id)
+        ]
+        deadline = _solver_deadline()
+        store_plans = _partition_planner(DEFAULT_ENGINE, deadline)(
+            partition,
+            context.schedule_dates,
+            context.manual_pairs,
+            absent_by_date=context.absent_by_date,
+        )
+        plan = [
+            shift
+            for per_day in store_plans.values()
+            for day_plan in per_day
+            for shift in day_plan
+        ]
+        if context.riders and dates:
+            if DEFAULT_ENGINE == "flow":
+                from app.services.optimal import plan_external_days_optimal
+
+                external_plans = plan_external_days_optimal(context, sorted(dates), deadline)
+            else:
+                external_plans = [plan_external_day(context, day) for day in sorted(dates)]
+            plan.extend(shift for day_plan in external_plans for shift in day_plan)
+        scope = or_(
+            ScheduleAssignment.store_id.in_(stores),
+            and_(
+                ScheduleAssignment.store_id.is_(None),
+                ScheduleAssignment.shift_date.in_(dates),
+            ),
+        )
+        for key, value in reconcile_generated(
+            db, plan, start_date, days, chunk_size, scope=scope
+        ).items():
+            counts[key] += value
+        db.commit()
+    except Exception:
+        db.rollback()
+        invalidations.restore(stores, dates, start_date, end_date)
+        raise
+    versions.bump_schedule(start_date, end_date)
+    counts.update(stores=len(stores), dates=len(dates))
+    return counts
@@ -0,0 +1,121 @@
+from typing import Dict, Iterator, List, Optional
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import itertools
+import os
+import threading
+import time
+
+
+# Finished traces kept in memory for the admin endpoint
+DEFAULT_TRACE_HISTORY = int(os.getenv("SCHEDULE_TRACE_HISTORY", "100"))
+
+
+class Span:
+    """Timed phase of a trace; ``rows`` and ``detail`` are set by the instrumented code"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: Optional[int] = None
+        self.detail: Optional[Dict[str, int]] = None
+        self.duration_ms = 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "duration_ms": self.duration_ms,
+            "rows": self.rows,
+            "detail": self.detail,
+        }
+
+
+class Trace:
+    def __init__(self, trace_id: int, name: str):
+        self.id = trace_id
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self.spans: List[Span] = []
+
+    def server_timing(self) -> str:
+        """Spans in the ``Server-Timing`` header format, row counts as ``desc``"""
+        return ", ".join(
+            f"{span.name};dur={span.duration_ms}"
+            + ("" if span.rows is None else f';desc="rows={span.rows}"')
+            for span in self.spans
+        )
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "spans": [span.as_dict() for span in self.spans],
+        }
+
+
+class TraceStore:
+    """Thread-safe ring of the most recent finished traces"""
+
+    def __init__(self, max_traces: int = DEFAULT_TRACE_HISTORY):
+        self._traces: "deque[Trace]" = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def record(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self, limit: int = 50) -> List[Trace]:
+        """Newest first"""
+        with self._lock:
+            return list(itertools.islice(reversed(self._traces), limit))
+
+    def get(self, trace_id: int) -> Optional[Trace]:
+        with self._lock:
+            return next((trace for trace in self._traces if trace.id == trace_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+trace_store = TraceStore()
+_current: ContextVar[Optional[Trace]] = ContextVar("schedule_trace", default=None)
+
+
+@contextmanager
+def trace(name: str) -> Iterator[Trace]:
+    """Collect the spans opened in this context and record them on exit"""
+    current = Trace(trace_store.next_id(), name)
+    token = _current.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        _current.reset(token)
+        trace_store.record(current)
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span]:
+    """Time a phase of the current trace; a no-op outside of one"""
+    current = _current.get()
+    phase = Span(name)
+    if current is None:
+        yield phase
+        return
+    started = time.perf_counter()
+    try:
+        yield phase
+    finally:
+        phase.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        current.spans.append(phase)
@@ -0,0 +1,161 @@
+"""NumPy store-pass engine: every store of a partition is planned per day in arrays"""
+from typing import Dict, List, Optional, Set, Tuple
+from app.services.scheduling import (
+    PlannedShift,
+    Rotations,
+    StorePartition,
+    StoreRotation,
+)
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the heap engine needs nothing
+    np = None
+
+
+HAS_NUMPY = np is not None
+
+
+def _segment_min(counts, blocked, positions, starts, size: int):
+    """Least loaded unblocked rider per store, and which stores have one"""
+    blocked_key = np.iinfo(np.int64).max
+    keys = np.where(blocked, blocked_key, counts * size + positions)
+    minimum = np.minimum.reduceat(keys, starts)
+    return minimum % size, minimum != blocked_key
+
+
+def plan_store_partition_vectorized(
+    partition: StorePartition,
+    schedule_dates: List[date],
+    manual_pairs: Set[Tuple[date, int]],
+    rotations: Optional[Rotations] = None,
+    absent_by_date: Optional[Dict[date, Set[int]]] = None,
+) -> Dict[int, List[List[PlannedShift]]]:
+    """Drop-in replacement for ``plan_store_partition`` backed by NumPy"""
+    if np is None:
+        raise RuntimeError("The numpy scheduling engine requires numpy")
+    result: Dict[int, List[List[PlannedShift]]] = {}
+    store_ids: List[int] = []
+    rider_ids: List[int] = []
+    starts: List[int] = []
+    carried: List[Optional[StoreRotation]] = []
+    for store_id, ids in partition:
+        rotation = rotations.get(store_id) if rotations is not None else None
+        if rotation is not None:
+            ids = rotation.rider_ids
+        result[store_id] = [[] for _ in schedule_dates]
+        if not ids:
+            if rotations is not None and rotation is None:
+                rotations[store_id] = StoreRotation(store_id, ids)
+            continue
+        store_ids.append(store_id)
+        starts.append(len(rider_ids))
+        rider_ids.extend(ids)
+        carried.append(rotation)
+    if not store_ids:
+        return result
+
+    size = len(rider_ids)
+    ends = starts[1:] + [size]
+    am = np.zeros(size, dtype=np.int64)
+    pm = np.zeros(size, dtype=np.int64)
+    rest = np.zeros(size, dtype=np.int64)
+    double = np.zeros(size, dtype=np.int64)
+    for rotation, start, end in zip(carried, starts, ends):
+        if rotation is not None:
+            am[start:end] = rotation.am.counts
+            pm[start:end] = rotation.pm.counts
+            rest[start:end] = rotation.rest.counts
+            double[start:end] = rotation.double
+    positions = np.arange(size, dtype=np.int64)
+    segment_starts = np.array(starts, dtype=np.int64)
+    index_of = {rider_id: index for index, rider_id in enumerate(rider_ids)}
+
+    manual_by_date: Dict[date, List[int]] = {}
+    for shift_date, rider_id in manual_pairs:
+        index = index_of.get(rider_id)
+        if index is not None:
+            manual_by_date.setdefault(shift_date, []).append(index)
+
+    for day_offset, shift_date in enumerate(schedule_dates):
+        absent = np.zeros(size, dtype=bool)
+        if absent_by_date:
+            absent_ids = absent_by_date.get(shift_date)
+            if absent_ids:
+                absent[[index_of[r] for r in absent_ids if r in index_of]] = True
+        manual = np.zeros(size, dtype=bool)
+        manual[manual_by_date.get(shift_date, [])] = True
+
+        rest_emit = None
+        exclude = absent
+        if shift_date.weekday() % 2 == 1:
+            rest_pick, rest_valid = _segment_min(
+                rest, absent, positions, segment_starts, size
+            )
+            rest_emit = rest_valid & ~manual[rest_pick]
+            rest[rest_pick[rest_emit]] += 1
+            exclude = absent.copy()
+            exclude[rest_pick[rest_valid]] = True
+
+        am_pick, valid = _segment_min(am, exclude, positions, segment_starts, size)
+        pm_pick, _ = _segment_min(pm, exclude, positions, segment_starts, size)
+        same = valid & (am_pick == pm_pick)
+        double_emit = same & ~manual[am_pick]
+        am_emit = valid & ~same & ~manual[am_pick]
+        pm_emit = valid & ~same & ~manual[pm_pick]
+        double[am_pick[double_emit]] += 1
+        am[am_pick[am_emit]] += 1
+        pm[pm_pick[pm_emit]] += 1
+
+        active = double_emit | am_emit | pm_emit
+        if rest_emit is not None:
+            active |= rest_emit
+        segments = np.flatnonzero(active)
+        if rest_emit is not None:
+            rest_flags = rest_emit[segments].tolist()
+            rest_indexes = rest_pick[segments].tolist()
+        else:
+            rest_flags = rest_indexes = [False] * len(segments)
+        rows = zip(
+            segments.tolist(),
+            rest_flags,
+            rest_indexes,
+            double_emit[segments].tolist(),
+            am_emit[segments].tolist(),
+            pm_emit[segments].tolist(),
+            am_pick[segments].tolist(),
+            pm_pick[segments].tolist(),
+        )
+        for segment, is_rest, rest_index, is_double, is_am, is_pm, am_index, pm_index in rows:
+            store_id = store_ids[segment]
+            day_plan = result[store_id][day_offset]
+            if is_rest:
+                day_plan.append(
+                    PlannedShift(rider_ids[rest_index], store_id, None, shift_date, "DESCANSO")
+                )
+            if is_double:
+                day_plan.append(
+                    PlannedShift(rider_ids[am_index], store_id, None, shift_date, "AM Y PM")
+                )
+                continue
+            if is_am:
+                day_plan.append(
+                    PlannedShift(rider_ids[am_index], store_id, None, shift_date, "AM")
+                )
+            if is_pm:
+                day_plan.append(
+                    PlannedShift(rider_ids[pm_index], store_id, None, shift_date, "PM")
+                )
+
+    if rotations is not None:
+        for store_id, start, end in zip(store_ids, starts, ends):
+            rotations[store_id] = StoreRotation.from_counts(
+                store_id,
+                rider_ids[start:end],
+                am[start:end].tolist(),
+                pm[start:end].tolist(),
+                rest[start:end].tolist(),
+                double[start:end].tolist(),
+            )
+    return result
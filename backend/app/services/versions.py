@@ -0,0 +1,103 @@
+from typing import Dict, Hashable, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from datetime import date, timedelta
+import os
+import threading
+import uuid
+
+
+# Serialized list bodies kept in memory, in megabytes
+DEFAULT_RESPONSE_CACHE_MB = int(os.getenv("LIST_RESPONSE_CACHE_MB", "64"))
+
+REFERENCE_TABLES = ("riders", "stores", "brands")
+
+
+def _week(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+# The schedule has one counter per ISO week; counters only grow, so a range is
+# versioned by the sum of its weeks. Writers bump after their commit.
+class ChangeVersions:
+    """Change counters behind the ETags of the list endpoints"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Keeps ETags handed out by an earlier process from matching
+        self.epoch = uuid.uuid4().hex[:8]
+        self.tables: Dict[str, int] = defaultdict(int)
+        self.weeks: Dict[date, int] = defaultdict(int)
+
+    def version(self, table: str) -> int:
+        with self._lock:
+            return self.tables[table]
+
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for table in tables:
+                self.tables[table] += 1
+
+    def bump_schedule(self, start_date: date, end_date: Optional[date] = None) -> None:
+        week = _week(start_date)
+        last = _week(end_date or start_date)
+        with self._lock:
+            while week <= last:
+                self.weeks[week] += 1
+                week += timedelta(days=7)
+
+    def etag(self, *tables: str) -> str:
+        with self._lock:
+            parts = [f"{table[0]}{self.tables[table]}" for table in tables]
+        return f'"{self.epoch}-{"-".join(parts)}"'
+
+    def schedule_etag(self, start_date: date, end_date: date) -> str:
+        """ETag of a listing range; its rows embed riders, stores and brands"""
+        week = _week(start_date)
+        last = _week(end_date)
+        total = 0
+        with self._lock:
+            while week <= last:
+                total += self.weeks.get(week, 0)
+                week += timedelta(days=7)
+            parts = [f"{table[0]}{self.tables[table]}" for table in REFERENCE_TABLES]
+        return f'"{self.epoch}-w{total}-{"-".join(parts)}"'
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized bodies, bounded by their total size"""
+
+    def __init__(self, max_bytes: int = DEFAULT_RESPONSE_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        # A body worth a quarter of the cache would evict everything else
+        if len(body) > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self._entries[key] = (body, headers or {})
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+versions = ChangeVersions()
+response_cache = ResponseCache()
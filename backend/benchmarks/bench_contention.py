@@ -0,0 +1,106 @@
+"""Fire concurrent generate calls and count how often the work actually runs.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_contention --callers 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from app.models.models import ScheduleAssignment
+from app.services import services
+from app.services.locking import generation_flight
+from benchmarks.synthetic import make_session, seed
+
+
+def _concurrently(callers: int, target) -> float:
+    barrier = threading.Barrier(callers)
+    errors = []
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        try:
+            target(index)
+        except Exception as exc:  # reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(callers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--stores", type=int, default=150)
+    parser.add_argument("--days", type=int, default=31)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "contention.db")
+    db = make_session(f"sqlite:///{path}")
+    start_date = date(2026, 1, 5)
+    seed(db, args.stores, 5, external_riders=40, brands=10, days=args.days)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    db.close()
+
+    def same_range(index: int) -> None:
+        session = Session()
+        try:
+            services.generate_schedule(session, start_date, args.days)
+        finally:
+            session.close()
+
+    elapsed = _concurrently(args.callers, same_range)
+    print(
+        f"identical ranges: {args.callers} callers, "
+        f"{generation_flight.executions} generation(s), "
+        f"{generation_flight.shared} shared result(s), {elapsed:.3f}s"
+    )
+
+    def overlapping_range(index: int) -> None:
+        session = Session()
+        try:
+            services.generate_schedule(
+                session, start_date + timedelta(days=index), args.days
+            )
+        finally:
+            session.close()
+
+    elapsed = _concurrently(args.callers, overlapping_range)
+    session = Session()
+    duplicates = (
+        session.query(
+            ScheduleAssignment.rider_id,
+            ScheduleAssignment.shift_date,
+            func.count(),
+        )
+        .group_by(
+            ScheduleAssignment.rider_id,
+            ScheduleAssignment.shift_date,
+            ScheduleAssignment.shift_type,
+            ScheduleAssignment.store_id,
+            ScheduleAssignment.external_brand_id,
+        )
+        .having(func.count() > 1)
+        .count()
+    )
+    session.close()
+    print(
+        f"overlapping ranges: {args.callers} callers, {elapsed:.3f}s, "
+        f"{duplicates} duplicated row(s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
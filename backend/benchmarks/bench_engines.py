@@ -0,0 +1,69 @@
+"""Time the heap and NumPy store-pass engines on the same network.
+
+Run from the backend directory (the numpy engine needs numpy installed):
+
+    python -m benchmarks.bench_engines --riders 5000 20000
+"""
+import argparse
+import time
+from datetime import date
+from app.services.scheduling import SchedulingContext, plan_store_pass
+from benchmarks.synthetic import make_session, seed
+
+
+def _time(context: SchedulingContext, engine: str, workers: int) -> tuple:
+    started = time.perf_counter()
+    plans = plan_store_pass(context, workers, engine=engine)
+    elapsed = time.perf_counter() - started
+    rows = [shift for store_id in sorted(plans) for day in plans[store_id] for shift in day]
+    return elapsed, rows
+
+
+def run(riders: int, riders_per_store: int, days: int, workers: int = 1) -> dict:
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    stores = max(1, riders // riders_per_store)
+    seed(
+        db,
+        stores,
+        riders_per_store,
+        manual_overrides=stores,
+        start_date=start_date,
+        days=days,
+    )
+    context = SchedulingContext.load(db, start_date, days)
+    db.close()
+    heap_s, expected = _time(context, "heap", workers)
+    numpy_s, actual = _time(context, "numpy", workers)
+    if actual != expected:
+        raise AssertionError(f"numpy engine diverges from the heap engine at {riders} riders")
+    return {
+        "stores": stores,
+        "riders": len(context.riders),
+        "days": days,
+        "rows": len(actual),
+        "heap_s": round(heap_s, 4),
+        "numpy_s": round(numpy_s, 4),
+        "speedup": round(heap_s / numpy_s, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--riders", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--riders-per-store", type=int, default=5)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    print(f"{'stores':>7} {'riders':>7} {'days':>5} {'rows':>8} {'heap':>8} {'numpy':>8} {'speedup':>8}")
+    for riders in args.riders:
+        result = run(riders, args.riders_per_store, args.days, args.workers)
+        print(
+            f"{result['stores']:>7} {result['riders']:>7} {result['days']:>5} "
+            f"{result['rows']:>8} {result['heap_s']:>8} {result['numpy_s']:>8} "
+            f"{result['speedup']:>7}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Time the TC/FDS external-brand pass against the original rescanning loop.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_external --brands 200 --riders 2000
+"""
+import argparse
+import time
+from datetime import date
+from app.services.scheduling import SchedulingContext, plan_external_day
+from benchmarks.reference import reference_external_day
+from benchmarks.synthetic import make_session, seed
+
+
+def _time(fn, context: SchedulingContext) -> tuple:
+    started = time.perf_counter()
+    rows = [shift for day in context.schedule_dates for shift in fn(context, day)]
+    return time.perf_counter() - started, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--brands", type=int, default=200)
+    parser.add_argument("--riders", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=31)
+    args = parser.parse_args()
+
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    seed(
+        db,
+        stores=0,
+        external_riders=args.riders,
+        brands=args.brands,
+        manual_overrides=args.riders // 10,
+        start_date=start_date,
+        days=args.days,
+    )
+    context = SchedulingContext.load(db, start_date, args.days)
+    reference_s, expected = _time(reference_external_day, context)
+    deque_s, actual = _time(plan_external_day, context)
+    if actual != expected:
+        raise AssertionError("external pass diverges from the reference")
+    print(
+        f"{args.brands} brands, {len(context.external_pool)} TC/FDS riders, "
+        f"{args.days} days, {len(actual)} rows"
+    )
+    print(f"reference: {reference_s:.3f}s")
+    print(f"deque:     {deque_s:.3f}s ({reference_s / deque_s:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
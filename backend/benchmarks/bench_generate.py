@@ -0,0 +1,66 @@
+"""Measure how generate_schedule scales with the size of the network.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_generate
+"""
+import argparse
+import time
+from datetime import date
+from app.services import services
+from app.services.scheduling import SchedulingContext, build_assignments
+from benchmarks.synthetic import make_session, seed
+
+
+SIZES = [(25, 5), (100, 5), (300, 7)]
+
+
+def run(stores: int, riders_per_store: int, days: int, workers: int = 1) -> dict:
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    seed(
+        db,
+        stores,
+        riders_per_store,
+        external_riders=stores,
+        brands=stores // 4,
+        manual_overrides=stores,
+        start_date=start_date,
+        days=days,
+    )
+    started = time.perf_counter()
+    context = SchedulingContext.load(db, start_date, days)
+    loaded = time.perf_counter()
+    assignments = build_assignments(context, workers=workers)
+    built = time.perf_counter()
+    services.generate_schedule(db, start_date, days, workers=workers)
+    finished = time.perf_counter()
+    db.close()
+    return {
+        "stores": stores,
+        "riders": len(context.riders),
+        "days": days,
+        "assignments": len(assignments),
+        "load_s": round(loaded - started, 4),
+        "build_s": round(built - loaded, 4),
+        "generate_s": round(finished - built, 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    print(f"{'stores':>7} {'riders':>7} {'days':>5} {'rows':>8} {'load':>8} {'build':>8} {'total':>8}")
+    for stores, riders_per_store in SIZES:
+        result = run(stores, riders_per_store, args.days, args.workers)
+        print(
+            f"{result['stores']:>7} {result['riders']:>7} {result['days']:>5} "
+            f"{result['assignments']:>8} {result['load_s']:>8} {result['build_s']:>8} "
+            f"{result['generate_s']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
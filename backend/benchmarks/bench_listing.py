@@ -0,0 +1,115 @@
+"""Compare the ORM, column-projected and streamed paths behind GET /schedule.
+
+The ORM path is what the endpoint used to do: ``list_schedule_assignments``
+with three joinedloads, validation into ``ScheduleAssignmentDetail`` and
+JSON encoding. The projected path is ``list_schedule_rows`` encoded
+directly, and the streamed path is ``format=ndjson``: ``iter_schedule_rows``
+encoded chunk by chunk, whose peak memory should not grow with the range.
+Run from the backend directory:
+
+    python -m benchmarks.bench_listing --assignments 50000
+    python -m benchmarks.bench_listing --assignments 150000 --days 92
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Iterator, List
+from pydantic import TypeAdapter
+from app.api.schedules import ndjson_chunks
+from app.schemas import schemas
+from app.services import services
+from benchmarks.synthetic import make_session, seed
+
+
+# One store with its riders and the matching share of externals yields
+# about this many assignments per day
+ROWS_PER_STORE_DAY = 2.05
+
+
+def _orm_body(db, start_date: date, end_date: date) -> Iterator[bytes]:
+    adapter = TypeAdapter(List[schemas.ScheduleAssignmentDetail])
+    assignments = services.list_schedule_assignments(db, start_date, end_date)
+    yield adapter.dump_json(adapter.validate_python(assignments, from_attributes=True))
+
+
+def _projected_body(db, start_date: date, end_date: date) -> Iterator[bytes]:
+    rows = services.list_schedule_rows(db, start_date, end_date)
+    yield json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _streamed_body(db, start_date: date, end_date: date) -> Iterator[bytes]:
+    return ndjson_chunks(services.iter_schedule_rows(db, start_date, end_date))
+
+
+def _drain(chunks: Iterator[bytes]) -> tuple:
+    """Consume a body like a server would; returns (first-chunk time, bytes)."""
+    started = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - started
+        size += len(chunk)
+    return first, size
+
+
+def measure(db, start_date: date, end_date: date, build) -> dict:
+    db.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    first, size = _drain(build(db, start_date, end_date))
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # Timed again without tracing, which slows allocation-heavy code
+    db.expunge_all()
+    started = time.perf_counter()
+    untraced_first, _ = _drain(build(db, start_date, end_date))
+    untraced = time.perf_counter() - started
+    return {
+        "wall_s": round(min(elapsed, untraced), 4),
+        "first_s": round(min(first, untraced_first), 4),
+        "peak_kb": round(peak / 1024, 1),
+        "bytes": size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assignments", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=31)
+    args = parser.parse_args()
+
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    end_date = start_date + timedelta(days=args.days - 1)
+    stores = max(1, round(args.assignments / (args.days * ROWS_PER_STORE_DAY)))
+    seed(
+        db,
+        stores,
+        external_riders=stores,
+        brands=stores // 4,
+        manual_overrides=stores,
+        start_date=start_date,
+        days=args.days,
+    )
+    services.generate_schedule(db, start_date, args.days)
+    rows = len(services.list_schedule_rows(db, start_date, end_date))
+    print(f"{rows} rows over {args.days} days")
+    print(f"{'path':>10} {'wall':>8} {'first':>8} {'peak':>10} {'bytes':>10}")
+    paths = (("orm", _orm_body), ("projected", _projected_body), ("streamed", _streamed_body))
+    for name, build in paths:
+        result = measure(db, start_date, end_date, build)
+        print(
+            f"{name:>10} {result['wall_s']:>8} {result['first_s']:>8} "
+            f"{result['peak_kb']:>9}K {result['bytes']:>10}"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
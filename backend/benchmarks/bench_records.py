@@ -0,0 +1,94 @@
+"""Compare the slotted-record scheduling context with an ORM-backed one.
+
+The ORM path loads full ``Rider``/``PanpayaStore``/``ExternalBrand``
+instances into the session, as the generator used to, and hands them to
+``SchedulingContext``; the record path is ``SchedulingContext.load``.
+Both then plan the same horizon. Run from the backend directory:
+
+    python -m benchmarks.bench_records --stores 1000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import date, timedelta
+from app.models.models import (
+    ExternalBrand,
+    PanpayaStore,
+    Rider,
+    RiderAbsence,
+    ScheduleAssignment,
+)
+from app.services.scheduling import SchedulingContext, plan_schedule
+from benchmarks.synthetic import make_session, seed
+
+
+def _orm_context(db, start_date: date, days: int) -> SchedulingContext:
+    riders = db.query(Rider).filter(Rider.active.is_(True)).order_by(Rider.id.asc()).all()
+    stores = db.query(PanpayaStore).order_by(PanpayaStore.id.asc()).all()
+    brands = db.query(ExternalBrand).order_by(ExternalBrand.name.asc()).all()
+    manual = (
+        db.query(ScheduleAssignment)
+        .filter(ScheduleAssignment.manual_override.is_(True))
+        .filter(ScheduleAssignment.shift_date >= start_date)
+        .filter(ScheduleAssignment.shift_date < start_date + timedelta(days=days))
+        .all()
+    )
+    absences = db.query(RiderAbsence).all()
+    context = SchedulingContext(riders, stores, brands, manual, start_date, days, absences)
+    # Keep the ORM instances alive with the context, as the old path did
+    context.orm_instances = (riders, stores, brands)
+    return context
+
+
+def measure(db, start_date: date, days: int, loader) -> dict:
+    db.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    context = loader(db, start_date, days)
+    loaded = time.perf_counter()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    plan_started = time.perf_counter()
+    plan = plan_schedule(context)
+    finished = time.perf_counter()
+    return {
+        "load_s": round(loaded - started, 4),
+        "plan_s": round(finished - plan_started, 4),
+        "retained_kb": round(retained / 1024, 1),
+        "rows": len(plan),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stores", type=int, default=1000)
+    parser.add_argument("--riders-per-store", type=int, default=5)
+    parser.add_argument("--days", type=int, default=31)
+    args = parser.parse_args()
+
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    seed(
+        db,
+        args.stores,
+        args.riders_per_store,
+        external_riders=args.stores,
+        brands=args.stores // 4,
+        manual_overrides=args.stores,
+        start_date=start_date,
+        days=args.days,
+    )
+    print(f"{'path':>8} {'load':>8} {'plan':>8} {'retained':>10} {'rows':>8}")
+    for name, loader in (("orm", _orm_context), ("records", SchedulingContext.load)):
+        result = measure(db, start_date, args.days, loader)
+        print(
+            f"{name:>8} {result['load_s']:>8} {result['plan_s']:>8} "
+            f"{result['retained_kb']:>9}K {result['rows']:>8}"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure the reference cache on scheduling-context loads and store checks.
+
+Cold loads clear the cache first, as every run used to read the riders,
+stores and brands again; warm loads reuse the cached tables. Store checks
+compare ``services.get_store``, which the rider endpoints used to
+validate ``store_id``, with a cache lookup. Run from the backend directory:
+
+    python -m benchmarks.bench_reference --stores 1000
+"""
+import argparse
+import time
+from datetime import date
+from sqlalchemy import event
+from app.services import services
+from app.services.reference import reference_cache
+from app.services.scheduling import SchedulingContext
+from benchmarks.synthetic import make_session, seed
+
+
+def measure(db, step, runs: int, cold: bool) -> dict:
+    queries = [0]
+
+    def count(*_args) -> None:
+        queries[0] += 1
+
+    event.listen(db.get_bind(), "before_cursor_execute", count)
+    best = None
+    for _ in range(runs):
+        if cold:
+            reference_cache.clear()
+        started = time.perf_counter()
+        step(db)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    event.remove(db.get_bind(), "before_cursor_execute", count)
+    return {"best_ms": round(best * 1000, 2), "queries": queries[0] / runs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stores", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    seed(
+        db,
+        args.stores,
+        external_riders=args.stores,
+        brands=args.stores // 4,
+        manual_overrides=args.stores,
+        start_date=start_date,
+        days=args.days,
+    )
+    store_ids = list(range(1, args.stores + 1))
+    load = lambda s: SchedulingContext.load(s, start_date, args.days)
+    steps = [
+        ("context load", "cold", load, True),
+        ("context load", "warm", load, False),
+        ("store checks", "sql", lambda s: [services.get_store(s, i) for i in store_ids], False),
+        ("store checks", "cache", lambda s: [reference_cache.store(s, i) for i in store_ids], False),
+    ]
+    print(f"{'step':>14} {'path':>6} {'best':>10} {'queries':>8}")
+    for name, label, step, cold in steps:
+        result = measure(db, step, args.runs, cold)
+        print(f"{name:>14} {label:>6} {result['best_ms']:>8}ms {result['queries']:>8}")
+    for stats in reference_cache.stats():
+        print(f"{stats['table']:>14} {stats['hits']:>6} hits {stats['misses']:>6} misses")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
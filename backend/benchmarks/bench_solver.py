@@ -0,0 +1,65 @@
+"""Compare the fairness spread and solve time of the greedy and flow engines.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_solver --stores 300 --days 31
+
+The spread is the widest max-min gap between riders of one store (and
+across the TC/FDS pool for EXTERNO days); lower is fairer.
+"""
+import argparse
+import time
+from datetime import date
+from app.services.optimal import fairness_spread
+from app.services.scheduling import SchedulingContext, plan_schedule
+from benchmarks.synthetic import make_session, seed
+
+
+COUNTERS = ("am", "pm", "rest", "work", "external")
+
+
+def run(context: SchedulingContext, engine: str) -> dict:
+    started = time.perf_counter()
+    plan = plan_schedule(context, engine=engine)
+    elapsed = time.perf_counter() - started
+    result = fairness_spread(context, plan)
+    result["rows"] = len(plan)
+    result["solve_s"] = round(elapsed, 4)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stores", type=int, default=300)
+    parser.add_argument("--riders-per-store", type=int, default=5)
+    parser.add_argument("--external-riders", type=int, default=300)
+    parser.add_argument("--brands", type=int, default=75)
+    parser.add_argument("--days", type=int, default=31)
+    args = parser.parse_args()
+
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    seed(
+        db,
+        args.stores,
+        args.riders_per_store,
+        external_riders=args.external_riders,
+        brands=args.brands,
+        manual_overrides=args.stores,
+        start_date=start_date,
+        days=args.days,
+    )
+    print(f"{'engine':>7} {'rows':>8} " + " ".join(f"{c:>8}" for c in COUNTERS) + f" {'solve':>8}")
+    for engine in ("heap", "flow"):
+        context = SchedulingContext.load(db, start_date, args.days)
+        result = run(context, engine)
+        print(
+            f"{engine:>7} {result['rows']:>8} "
+            + " ".join(f"{result[c]:>8}" for c in COUNTERS)
+            + f" {result['solve_s']:>8}"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare SQL-side schedule statistics with totals computed from the listing.
+
+The listing path is what clients did: fetch every row of the range and
+count per group. Both must agree for every grouping. Run from the backend
+directory:
+
+    python -m benchmarks.bench_stats --stores 100 --days 365
+"""
+import argparse
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from app.services import services
+from benchmarks.synthetic import make_session, seed
+
+
+GROUPINGS = [["rider"], ["store"], ["brand"], ["zone", "shift_type"], ["week"], ["store", "week"]]
+
+
+def _row_key(row: dict, name: str):
+    if name == "zone":
+        return row["store"]["zone"] if row["store"] else None
+    if name == "week":
+        shift_date = date.fromisoformat(row["shift_date"])
+        return shift_date - timedelta(days=shift_date.weekday())
+    return row[services.STATS_GROUPS[name][0]]
+
+
+def listing_stats(db, start_date: date, end_date: date, group_by: list) -> dict:
+    totals = defaultdict(lambda: defaultdict(int))
+    dates = defaultdict(set)
+    for row in services.list_schedule_rows(db, start_date, end_date):
+        key = tuple(_row_key(row, name) for name in group_by)
+        counts = totals[key]
+        shift_type = row["shift_type"]
+        counts["assignments"] += 1
+        counts["am"] += shift_type == "AM"
+        counts["pm"] += shift_type == "PM"
+        counts["doubles"] += shift_type.upper() == "AM Y PM"
+        counts["rest"] += shift_type == "DESCANSO"
+        counts["external"] += shift_type == "EXTERNO"
+        counts["available"] += shift_type == "DISPONIBLE"
+        counts["manual"] += row["manual_override"]
+        dates[key].add(row["shift_date"])
+    return {key: dict(counts, days=len(dates[key])) for key, counts in totals.items()}
+
+
+def sql_stats(db, start_date: date, end_date: date, group_by: list) -> dict:
+    keys = [services.STATS_GROUPS[name][0] for name in group_by]
+    return {
+        tuple(row.pop(key) for key in keys): row
+        for row in services.schedule_stats(db, start_date, end_date, group_by)
+    }
+
+
+def timed(function, *args) -> tuple:
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stores", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    end_date = start_date + timedelta(days=args.days - 1)
+    seed(
+        db,
+        args.stores,
+        external_riders=args.stores,
+        brands=args.stores // 4,
+        manual_overrides=args.stores,
+        start_date=start_date,
+        days=args.days,
+    )
+    services.generate_schedule_horizon(db, start_date, args.days)
+    rows = len(services.list_schedule_rows(db, start_date, end_date))
+    print(f"{rows} assignments over {args.days} days")
+    print(f"{'group_by':>16} {'groups':>7} {'listing':>9} {'sql':>9}")
+    for group_by in GROUPINGS:
+        expected, listing_s = timed(listing_stats, db, start_date, end_date, group_by)
+        actual, sql_s = timed(sql_stats, db, start_date, end_date, group_by)
+        if actual != expected:
+            raise AssertionError(f"group_by={group_by} totals differ from the listing")
+        print(f"{','.join(group_by):>16} {len(actual):>7} {listing_s:>8.3f}s {sql_s:>8.3f}s")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare the unassigned-rider anti-join with the per-day comparison in Python.
+
+The Python path is what the dashboard did in the browser: fetch every
+active rider and every assignment of the range, then take the difference
+day by day. The anti-join must return the same riders and probe the
+(rider_id, shift_date) index. Run from the backend directory:
+
+    python -m benchmarks.bench_unassigned --riders 2000 --days 31
+"""
+import argparse
+import json
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from sqlalchemy import event, select
+from app.models.models import Rider
+from app.services import services
+from benchmarks.synthetic import make_session, seed
+
+
+INDEX = "ix_schedule_assignments_rider_date"
+
+
+def python_unassigned(db, start_date: date, end_date: date) -> dict:
+    riders = db.execute(
+        select(Rider.id).where(Rider.active.is_(True)).order_by(Rider.id)
+    ).scalars().all()
+    assigned = defaultdict(set)
+    for row in services.list_schedule_rows(db, start_date, end_date):
+        assigned[row["shift_date"]].add(row["rider_id"])
+    unassigned = {}
+    for offset in range((end_date - start_date).days + 1):
+        shift_date = start_date + timedelta(days=offset)
+        taken = assigned[shift_date.isoformat()]
+        unassigned[shift_date] = [rider_id for rider_id in riders if rider_id not in taken]
+    return unassigned
+
+
+def check_plan(db, start_date: date, end_date: date) -> None:
+    statements = []
+
+    def record(_connection, _cursor, statement, parameters, *_args) -> None:
+        statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        services.unassigned_riders(db, start_date, end_date)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    if len(statements) != 1:
+        raise AssertionError(f"the anti-join took {len(statements)} statements")
+    statement, parameters = statements[0]
+    plan = [
+        row[-1]
+        for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    ]
+    if not any(INDEX in step for step in plan):
+        raise AssertionError(f"the anti-join does not probe {INDEX}: {plan}")
+
+
+def timed(function, *args) -> tuple:
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--riders", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=31)
+    args = parser.parse_args()
+
+    db = make_session()
+    start_date = date(2026, 1, 5)
+    end_date = start_date + timedelta(days=args.days - 1)
+    # Five store riders per store plus as many TC/FDS riders as stores
+    stores = max(1, args.riders // 6)
+    seed(
+        db,
+        stores,
+        external_riders=stores,
+        brands=stores // 4,
+        manual_overrides=stores,
+        start_date=start_date,
+        days=args.days,
+    )
+    services.generate_schedule(db, start_date, args.days)
+    riders = db.execute(select(Rider.id).where(Rider.active.is_(True))).scalars().all()
+    check_plan(db, start_date, end_date)
+    expected, python_s = timed(python_unassigned, db, start_date, end_date)
+    actual, sql_s = timed(services.unassigned_riders, db, start_date, end_date)
+    if actual != expected:
+        raise AssertionError("the anti-join disagrees with the per-day comparison")
+    pairs = sum(len(rider_ids) for rider_ids in actual.values())
+    # What the browser had to download for its own comparison
+    listing = len(json.dumps(services.list_schedule_rows(db, start_date, end_date)))
+    unassigned = len(json.dumps([rider_ids for rider_ids in actual.values()]))
+    print(f"{len(riders)} active riders x {args.days} days, {pairs} unassigned pairs")
+    print(f"  python per-day difference {python_s:.3f}s, listing {listing // 1024}K")
+    print(f"  anti-join                 {sql_s:.3f}s, result {unassigned // 1024}K")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Check the ETags and conditional GETs of the list endpoints.
+
+Run from the backend directory:
+
+    python -m benchmarks.check_conditional
+
+A repeated request with ``If-None-Match`` must get a 304 and a repeated
+request without it a cached body, both without a single SQL statement.
+Every write path must change the ETags it affects, and a schedule write
+must leave ranges in other weeks alone.
+"""
+from datetime import date, timedelta
+from typing import Callable, Optional
+from sqlalchemy import event
+from starlette.requests import Request
+from app.api import brands, riders, schedules, stores
+from app.schemas import schemas
+from app.services import services
+from benchmarks.synthetic import make_session, seed
+
+
+START_DATE = date(2026, 1, 5)
+DAYS = 28
+
+
+def _request(etag: Optional[str] = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def _schedule(db, start_date: date, end_date: date) -> Callable:
+    def get(request: Request):
+        return schedules.list_schedule(
+            request,
+            start_date,
+            end_date,
+            store_id=None,
+            rider_id=None,
+            external_brand_id=None,
+            shift_type=None,
+            zone=None,
+            manual_override=None,
+            limit=None,
+            after_date=None,
+            after_id=None,
+            response_format="json",
+            db=db,
+        )
+
+    return get
+
+
+def check_cached(db, name: str, get: Callable) -> str:
+    """Return the ETag after checking the 304 and cached-body paths are query-free"""
+    first = get(_request())
+    etag = first.headers["etag"]
+    statements = []
+    listener = lambda *_args: statements.append(1)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        not_modified = get(_request(etag))
+        cached = get(_request())
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    if not_modified.status_code != 304 or not_modified.body:
+        raise AssertionError(f"{name}: a matching If-None-Match is not answered with 304")
+    if cached.body != first.body or cached.headers["etag"] != etag:
+        raise AssertionError(f"{name}: the cached body differs from the first one")
+    if statements:
+        raise AssertionError(f"{name}: {len(statements)} statements for a cached response")
+    return etag
+
+
+def check_write(db, name: str, gets: dict, write: Callable, changed: set) -> None:
+    before = {key: get(_request()).headers["etag"] for key, get in gets.items()}
+    write()
+    db.expire_all()
+    for key, get in gets.items():
+        moved = get(_request()).headers["etag"] != before[key]
+        if moved != (key in changed):
+            verb = "does not change" if key in changed else "changes"
+            raise AssertionError(f"{name} {verb} the {key} ETag")
+
+
+def main() -> None:
+    db = make_session()
+    seed(db, 20, external_riders=20, brands=5, manual_overrides=20, start_date=START_DATE, days=DAYS)
+    services.generate_schedule(db, START_DATE, DAYS)
+    later = START_DATE + timedelta(days=DAYS)
+    gets = {
+        "riders": lambda request: riders.list_riders(request, 0, 100, False, db),
+        "stores": lambda request: stores.list_stores(request, 0, 100, db),
+        "brands": lambda request: brands.list_brands(request, db),
+        "january": _schedule(db, START_DATE, START_DATE + timedelta(days=6)),
+        "later": _schedule(db, later, later + timedelta(days=6)),
+    }
+    for name, get in gets.items():
+        check_cached(db, name, get)
+
+    assignment = services.list_schedule_assignments(db, START_DATE, START_DATE)[0]
+    rider = services.get_rider(db, assignment.rider_id)
+    store_id = services.get_stores(db)[0].id
+    schedule = {"january", "later"}
+    writes = [
+        ("update assignment", lambda: services.update_schedule_assignment(
+            db, assignment.id, schemas.ScheduleAssignmentUpdate(notes="check")), {"january"}),
+        ("delete assignment", lambda: services.delete_schedule_assignment(db, assignment.id), {"january"}),
+        ("generate", lambda: services.generate_schedule(db, later, 7), {"later"}),
+        ("reconcile", lambda: services.reconcile_schedule(db, START_DATE, 7), {"january"}),
+        ("update rider", lambda: services.update_rider(
+            db, rider.id, schemas.RiderUpdate(identification="555")), {"riders"} | schedule),
+        ("update store", lambda: services.update_store(
+            db, store_id, schemas.PanpayaStoreUpdate(address="check")), {"stores"} | schedule),
+        ("create brand", lambda: services.create_external_brand(
+            db, schemas.ExternalBrandCreate(name="Check")), {"brands"} | schedule),
+    ]
+    for name, write, changed in writes:
+        check_write(db, name, gets, write, changed)
+    print(f"{len(gets)} listings answer from their ETags; {len(writes)} writes bump the right ones")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare the generator against the reference algorithm on random datasets.
+
+Run from the backend directory:
+
+    python -m benchmarks.check_equivalence --datasets 50
+
+Every available greedy engine is checked; ``--engine`` limits the run to
+one of them. The "flow" engine optimizes instead and has its own benchmark.
+"""
+import argparse
+import random
+from datetime import date, timedelta
+from app.services.scheduling import (
+    GREEDY_ENGINES,
+    Rotations,
+    SchedulingContext,
+    build_assignments,
+    plan_schedule,
+)
+from app.services.vectorized import HAS_NUMPY
+from benchmarks.reference import reference_assignments
+from benchmarks.synthetic import make_session, seed
+
+
+def _rows(assignments):
+    return [
+        (a.rider_id, a.store_id, a.external_brand_id, a.shift_date, a.shift_type)
+        for a in assignments
+    ]
+
+
+def _chunked_rows(context: SchedulingContext, engines) -> list:
+    """Plan in 3-day chunks, alternating engines over shared rotations"""
+    rotations: Rotations = {}
+    rows = []
+    dates = context.schedule_dates
+    for number, offset in enumerate(range(0, len(dates), 3)):
+        plan = plan_schedule(
+            context,
+            schedule_dates=dates[offset : offset + 3],
+            rotations=rotations,
+            engine=engines[number % len(engines)],
+        )
+        rows.extend(_rows(plan))
+    return rows
+
+
+def check(seed_value: int, workers: int = 1, engines=GREEDY_ENGINES) -> int:
+    rng = random.Random(seed_value)
+    db = make_session()
+    start_date = date(2026, 1, 5) + timedelta(days=rng.randrange(7))
+    days = rng.randint(1, 31)
+    seed(
+        db,
+        stores=rng.randint(1, 40),
+        riders_per_store=rng.randint(1, 12),
+        external_riders=rng.randint(0, 60),
+        brands=rng.randint(0, 30),
+        manual_overrides=rng.randint(0, 80),
+        start_date=start_date,
+        days=days,
+        seed_value=seed_value,
+    )
+    context = SchedulingContext.load(db, start_date, days)
+    expected = _rows(reference_assignments(context))
+    for engine in engines:
+        actual = _rows(build_assignments(context, engine=engine))
+        if actual != expected:
+            raise AssertionError(
+                f"dataset {seed_value} diverges from the reference with {engine}"
+            )
+        if workers > 1:
+            for partition_by in ("zone", "store"):
+                parallel = _rows(build_assignments(context, workers, partition_by, engine))
+                if parallel != expected:
+                    raise AssertionError(
+                        f"dataset {seed_value} diverges with {engine}, "
+                        f"{workers} workers by {partition_by}"
+                    )
+    if _chunked_rows(context, engines) != expected:
+        raise AssertionError(f"dataset {seed_value} diverges when planned in chunks")
+    db.close()
+    return len(actual)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--datasets", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--engine", choices=GREEDY_ENGINES)
+    args = parser.parse_args()
+    if args.engine:
+        engines = (args.engine,)
+    else:
+        engines = tuple(e for e in GREEDY_ENGINES if e != "numpy" or HAS_NUMPY)
+    rows = 0
+    for offset in range(args.datasets):
+        rows += check(args.seed + offset, args.workers, engines)
+    print(
+        f"{args.datasets} datasets, {rows} assignments, "
+        f"all identical ({', '.join(engines)})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Check the filtered schedule listing: query plans, filters and keyset pages.
+
+Run from the backend directory:
+
+    python -m benchmarks.check_listing
+
+Every filter must be served by its composite index on SQLite, without a
+temporary B-tree for the (shift_date, id) ordering; filtered results must
+match a filter applied in Python, and walking the keyset pages must give
+back the unpaginated listing.
+"""
+import argparse
+from datetime import date, timedelta
+from sqlalchemy import text
+from app.services import services
+from app.services.services import schedule_rows_query
+from benchmarks.synthetic import make_session, seed
+
+
+START_DATE = date(2026, 1, 5)
+
+# Filter keyword arguments and the index expected to drive the query
+PLANS = [
+    ({}, "ix_schedule_assignments_shift_date"),
+    ({"store_id": 3}, "ix_schedule_assignments_store_date"),
+    ({"rider_id": 7}, "ix_schedule_assignments_rider_date"),
+    ({"external_brand_id": 2}, "ix_schedule_assignments_brand_date"),
+    ({"manual_override": True}, "ix_schedule_assignments_manual_date"),
+    ({"after": (START_DATE + timedelta(days=10), 500), "limit": 100}, "ix_schedule_assignments_shift_date"),
+]
+
+
+def query_plan(db, end_date: date, filters: dict) -> list:
+    query = schedule_rows_query(START_DATE, end_date, **filters)
+    sql = str(
+        query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    )
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def check_plans(db, end_date: date) -> None:
+    for filters, index in PLANS:
+        plan = query_plan(db, end_date, filters)
+        driving = next(step for step in plan if "schedule_assignments" in step)
+        if f"USING INDEX {index} " not in driving:
+            raise AssertionError(f"{filters} does not use {index}: {plan}")
+        if any("TEMP B-TREE" in step for step in plan):
+            raise AssertionError(f"{filters} sorts in a temporary B-tree: {plan}")
+
+
+def check_filters(db, end_date: date) -> None:
+    rows = services.list_schedule_rows(db, START_DATE, end_date)
+    zone_by_store = {
+        row["store"]["id"]: row["store"]["zone"] for row in rows if row["store"]
+    }
+    cases = {
+        "store_id": 3,
+        "rider_id": 7,
+        "external_brand_id": 2,
+        "shift_type": "DESCANSO",
+        "manual_override": True,
+    }
+    for key, value in cases.items():
+        expected = [row for row in rows if row[key] == value]
+        actual = services.list_schedule_rows(db, START_DATE, end_date, **{key: value})
+        if actual != expected or not expected:
+            raise AssertionError(f"filter {key}={value!r} returns the wrong rows")
+    expected = [row for row in rows if zone_by_store.get(row["store_id"]) == "SUR"]
+    if services.list_schedule_rows(db, START_DATE, end_date, zone="SUR") != expected:
+        raise AssertionError("filter zone='SUR' returns the wrong rows")
+
+
+def check_pages(db, end_date: date, page_size: int) -> int:
+    expected = services.list_schedule_rows(db, START_DATE, end_date)
+    pages = []
+    after = None
+    while True:
+        page = services.list_schedule_rows(
+            db, START_DATE, end_date, after=after, limit=page_size
+        )
+        pages.extend(page)
+        if len(page) < page_size:
+            break
+        after = (date.fromisoformat(page[-1]["shift_date"]), page[-1]["id"])
+    if pages != expected:
+        raise AssertionError("keyset pages do not add up to the full listing")
+    return len(pages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stores", type=int, default=100)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--page-size", type=int, default=250)
+    args = parser.parse_args()
+
+    db = make_session()
+    seed(
+        db,
+        args.stores,
+        external_riders=args.stores,
+        brands=args.stores // 4,
+        manual_overrides=args.stores,
+        start_date=START_DATE,
+        days=args.days,
+    )
+    services.generate_schedule(db, START_DATE, args.days)
+    db.execute(text("ANALYZE"))
+    end_date = START_DATE + timedelta(days=args.days - 1)
+    check_plans(db, end_date)
+    check_filters(db, end_date)
+    rows = check_pages(db, end_date, args.page_size)
+    print(f"{len(PLANS)} query plans use their indexes; filters and {rows} paged rows match")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
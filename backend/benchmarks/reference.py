@@ -0,0 +1,166 @@
+"""Reference implementation of the generator used for parity checks.
+
+This is the original linear-scan algorithm: every pick is a ``min()`` over
+the store riders and the counters live in a dict of dicts. Optimized
+engines must produce exactly the same assignments.
+"""
+from typing import List
+from app.models.models import ScheduleAssignment
+from app.services.scheduling import PlannedShift, SchedulingContext
+from datetime import date
+
+
+def reference_assignments(context: SchedulingContext) -> List[ScheduleAssignment]:
+    """Straightforward linear-scan generator kept as the parity baseline"""
+    if not context.riders:
+        return []
+    assignments: List[ScheduleAssignment] = []
+    counters = {
+        r.id: {"am": 0, "pm": 0, "double": 0, "rest": 0} for r in context.riders
+    }
+    manual_pairs = context.manual_pairs
+
+    def _assign_shifts(candidates, store, shift_date):
+        am_rider = min(candidates, key=lambda r: counters[r.id]["am"])
+        pm_rider = min(candidates, key=lambda r: counters[r.id]["pm"])
+        if am_rider.id == pm_rider.id:
+            if (shift_date, am_rider.id) in manual_pairs:
+                return
+            assignments.append(
+                ScheduleAssignment(
+                    rider_id=am_rider.id,
+                    store_id=store.id,
+                    shift_date=shift_date,
+                    shift_type="AM Y PM",
+                )
+            )
+            counters[am_rider.id]["double"] += 1
+            return
+        if (shift_date, am_rider.id) not in manual_pairs:
+            assignments.append(
+                ScheduleAssignment(
+                    rider_id=am_rider.id,
+                    store_id=store.id,
+                    shift_date=shift_date,
+                    shift_type="AM",
+                )
+            )
+            counters[am_rider.id]["am"] += 1
+        if (shift_date, pm_rider.id) not in manual_pairs:
+            assignments.append(
+                ScheduleAssignment(
+                    rider_id=pm_rider.id,
+                    store_id=store.id,
+                    shift_date=shift_date,
+                    shift_type="PM",
+                )
+            )
+            counters[pm_rider.id]["pm"] += 1
+
+    for shift_date in context.schedule_dates:
+        day_index = shift_date.weekday()
+        for store in context.stores:
+            eligible = [
+                r
+                for r in context.riders_by_store.get(store.id, [])
+                if context.is_available(r.id, shift_date)
+            ]
+            if not eligible:
+                continue
+            if day_index % 2 == 0:
+                _assign_shifts(eligible, store, shift_date)
+                continue
+            rest_rider = min(eligible, key=lambda r: counters[r.id]["rest"])
+            if (shift_date, rest_rider.id) not in manual_pairs:
+                assignments.append(
+                    ScheduleAssignment(
+                        rider_id=rest_rider.id,
+                        store_id=store.id,
+                        shift_date=shift_date,
+                        shift_type="DESCANSO",
+                    )
+                )
+                counters[rest_rider.id]["rest"] += 1
+            active_riders = [r for r in eligible if r.id != rest_rider.id]
+            if active_riders:
+                _assign_shifts(active_riders, store, shift_date)
+
+        pool = list(context.external_pool)
+        assigned_external = set()
+        for brand in context.external_brands:
+            available_riders = [
+                r
+                for r in pool
+                if r.id not in assigned_external
+                and context.is_available(r.id, shift_date)
+                and (shift_date, r.id) not in manual_pairs
+                and not (r.id in context.fds_ids and day_index < 5)
+            ]
+            if not available_riders:
+                break
+            rider = available_riders[0]
+            assigned_external.add(rider.id)
+            assignments.append(
+                ScheduleAssignment(
+                    rider_id=rider.id,
+                    external_brand_id=brand.id,
+                    shift_date=shift_date,
+                    shift_type="EXTERNO",
+                )
+            )
+            counters[rider.id]["am"] += 1
+            pool.append(pool.pop(pool.index(rider)))
+        for rider in pool:
+            if not context.is_available(rider.id, shift_date):
+                continue
+            if rider.id in context.fds_ids and day_index < 5:
+                continue
+            if rider.id in assigned_external:
+                continue
+            if (shift_date, rider.id) in manual_pairs:
+                continue
+            assignments.append(
+                ScheduleAssignment(
+                    rider_id=rider.id,
+                    shift_date=shift_date,
+                    shift_type="DISPONIBLE",
+                )
+            )
+    return assignments
+
+
+def reference_external_day(
+    context: SchedulingContext, shift_date: date
+) -> List[PlannedShift]:
+    """Original external-brand pass: rescans the pool for every brand"""
+    day_index = shift_date.weekday()
+    manual_pairs = context.manual_pairs
+    plan: List[PlannedShift] = []
+    pool = list(context.external_pool)
+    assigned_external = set()
+    for brand in context.external_brands:
+        available_riders = [
+            r
+            for r in pool
+            if r.id not in assigned_external
+            and context.is_available(r.id, shift_date)
+            and (shift_date, r.id) not in manual_pairs
+            and not (r.id in context.fds_ids and day_index < 5)
+        ]
+        if not available_riders:
+            break
+        rider = available_riders[0]
+        assigned_external.add(rider.id)
+        plan.append(PlannedShift(rider.id, None, brand.id, shift_date, "EXTERNO"))
+        pool.append(pool.pop(pool.index(rider)))
+    for rider in pool:
+        if not context.is_available(rider.id, shift_date):
+            continue
+        if rider.id in context.fds_ids and day_index < 5:
+            continue
+        if rider.id in assigned_external:
+            continue
+        if (shift_date, rider.id) in manual_pairs:
+            continue
+        plan.append(PlannedShift(rider.id, None, None, shift_date, "DISPONIBLE"))
+    return plan
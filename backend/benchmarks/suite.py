@@ -0,0 +1,236 @@
+"""Scenario benchmarks for generation, listing, export and import.
+
+Every scenario runs against a temporary SQLite file seeded from one of the
+``synthetic.SIZES`` presets and reports wall time, peak Python memory and
+the number of SQL statements it issued. Run from the backend directory:
+
+    python -m benchmarks.suite run --sizes small medium --output results.json
+    python -m benchmarks.suite compare results.json
+
+``compare`` checks a result file against ``benchmarks/baseline.json`` (or
+``--baseline``) and exits non-zero when a scenario got slower or heavier
+than the tolerance allows or issues more queries. ``run --save-baseline``
+refreshes the stored baseline; timings are machine dependent, so record it
+on the machine that runs the comparison.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, timedelta
+from io import BytesIO
+from typing import Callable, Dict, List
+from openpyxl import Workbook
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.datastructures import UploadFile
+from app.api import imports, schedules
+from app.models.models import PanpayaStore, Rider
+from app.services import services
+from benchmarks.synthetic import SIZES, make_session, seed
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+SCENARIOS = ("generate", "list", "export", "import")
+START_DATE = date(2026, 1, 5)
+# Wall-time increases below this many seconds are never reported
+MIN_WALL_DELTA_S = 0.1
+
+
+@contextmanager
+def _measure(db: Session, result: Dict[str, float], trace_memory: bool = False):
+    queries = [0]
+
+    def count(*_args) -> None:
+        queries[0] += 1
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if trace_memory:
+            result["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            tracemalloc.stop()
+        else:
+            result["wall_s"] = round(elapsed, 4)
+        event.remove(engine, "before_cursor_execute", count)
+        result["queries"] = queries[0]
+
+
+def _seeded(directory: str, name: str, size: str, days: int) -> Session:
+    db = make_session(f"sqlite:///{os.path.join(directory, name)}.db")
+    seed(db, manual_overrides=SIZES[size]["stores"], start_date=START_DATE, days=days, **SIZES[size])
+    return db
+
+
+async def _drain(response) -> int:
+    return sum([len(chunk) async for chunk in response.body_iterator])
+
+
+def _riders_workbook(db: Session) -> BytesIO:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["NOMBRE", "TIPO", "SUCURSAL", "OBSERVACION"])
+    for rider in db.query(Rider).order_by(Rider.id):
+        sheet.append(
+            [
+                rider.full_name,
+                rider.rider_type,
+                rider.store.code if rider.store else None,
+                rider.observation,
+            ]
+        )
+    output = BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def _repeat(db_factory: Callable[[], Session], step: Callable[[Session], dict], repeat: int) -> dict:
+    """Best wall time of ``repeat`` runs, then one traced run for peak memory"""
+    # tracemalloc slows allocation-heavy code a lot, so it stays out of the timed runs
+    walls = []
+    for _ in range(repeat):
+        db = db_factory()
+        timed: Dict[str, float] = {}
+        with _measure(db, timed):
+            step(db)
+        walls.append(timed["wall_s"])
+    db = db_factory()
+    result: Dict[str, float] = {}
+    with _measure(db, result, trace_memory=True):
+        result.update(step(db))
+    result["wall_s"] = min(walls)
+    return result
+
+
+def _import_target(directory: str, source: Session, attempt: List[int]) -> Session:
+    attempt[0] += 1
+    target = make_session(f"sqlite:///{os.path.join(directory, f'import{attempt[0]}')}.db")
+    target.add_all(
+        PanpayaStore(code=store.code, name=store.name, zone=store.zone)
+        for store in source.query(PanpayaStore).order_by(PanpayaStore.id)
+    )
+    target.commit()
+    return target
+
+
+def _import_riders(target: Session, workbook: bytes) -> dict:
+    counts = imports.import_riders(UploadFile(BytesIO(workbook), filename="riders.xlsx"), target)
+    return {"rows": counts["created"] + counts["updated"]}
+
+
+def run_size(size: str, days: int, scenarios: List[str], repeat: int = 3) -> Dict[str, dict]:
+    """Run the selected scenarios on one preset; each import run gets a fresh database"""
+    end_date = START_DATE + timedelta(days=days - 1)
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        db = _seeded(directory, "schedule", size, days)
+        steps: Dict[str, Callable[[Session], dict]] = {
+            "generate": lambda s: {"rows": len(services.generate_schedule(s, START_DATE, days))},
+            "list": lambda s: {
+                "rows": len(services.list_schedule_rows(s, START_DATE, end_date))
+            },
+            "export": lambda s: {
+                "bytes": asyncio.run(_drain(schedules.export_schedule(START_DATE, end_date, s)))
+            },
+        }
+        # Listing and export read the generated schedule, so generation
+        # always runs first when either is selected
+        wanted = [name for name in steps if name in scenarios]
+        if wanted and wanted[0] != "generate":
+            wanted.insert(0, "generate")
+        for name in wanted:
+            results[name] = _repeat(lambda: db, steps[name], repeat)
+        if "import" in scenarios:
+            workbook = _riders_workbook(db).getvalue()
+            targets: List[Session] = []
+            attempt = [0]
+
+            def fresh_target() -> Session:
+                targets.append(_import_target(directory, db, attempt))
+                return targets[-1]
+
+            results["import"] = _repeat(
+                fresh_target, lambda target: _import_riders(target, workbook), repeat
+            )
+            for target in targets:
+                target.get_bind().dispose()
+                target.close()
+        db.get_bind().dispose()
+        db.close()
+    return {name: results[name] for name in scenarios if name in results}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Describe every metric that regressed past ``tolerance`` (0.2 = 20%)"""
+    # Wall times within MIN_WALL_DELTA_S of the baseline are noise whatever the ratio
+    regressions = []
+    for size, scenarios in results.items():
+        for name, metrics in scenarios.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference is None:
+                continue
+            for metric in ("wall_s", "peak_kb"):
+                limit = reference[metric] * (1 + tolerance)
+                if metric == "wall_s":
+                    limit = max(limit, reference[metric] + MIN_WALL_DELTA_S)
+                if metrics[metric] > limit:
+                    regressions.append(
+                        f"{size}/{name}: {metric} {metrics[metric]} > {reference[metric]} (+{tolerance:.0%})"
+                    )
+            if metrics["queries"] > reference["queries"]:
+                regressions.append(
+                    f"{size}/{name}: queries {metrics['queries']} > {reference['queries']}"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run scenarios and print JSON results")
+    run_parser.add_argument("--sizes", nargs="+", choices=sorted(SIZES), default=["small", "medium"])
+    run_parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    run_parser.add_argument("--days", type=int, default=31)
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed runs per scenario")
+    run_parser.add_argument("--output", help="also write the results to this file")
+    run_parser.add_argument("--save-baseline", action="store_true")
+    compare_parser = commands.add_parser("compare", help="flag regressions against the baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--baseline", default=BASELINE_PATH)
+    compare_parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = {size: run_size(size, args.days, args.scenarios, args.repeat) for size in args.sizes}
+        text = json.dumps(results, indent=2, sort_keys=True)
+        print(text)
+        for path in filter(None, [args.output, BASELINE_PATH if args.save_baseline else None]):
+            with open(path, "w") as handle:
+                handle.write(text + "\n")
+        return
+    with open(args.results) as handle:
+        results = json.load(handle)
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
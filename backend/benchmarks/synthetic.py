@@ -0,0 +1,132 @@
+"""Seeded synthetic data for the scheduling benchmarks"""
+import random
+from datetime import date, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models.models import (
+    PanpayaStore,
+    Rider,
+    ExternalBrand,
+    ScheduleAssignment,
+    RiderAbsence,
+)
+from app.services.absences import observation_reason
+
+
+ZONES = ["NORTE", "SUR", "CENTRO", "OCCIDENTE", "ORIENTE"]
+OBSERVATIONS = [None] * 18 + ["VACACIONES", "Incapacidad medica"]
+
+# Network presets shared by the benchmark suite: seed() keyword arguments
+SIZES = {
+    "small": dict(stores=25, riders_per_store=5, external_riders=25, externo_riders=5, brands=6),
+    "medium": dict(stores=100, riders_per_store=5, external_riders=100, externo_riders=20, brands=25),
+    "large": dict(stores=300, riders_per_store=7, external_riders=300, externo_riders=60, brands=75),
+}
+
+
+def make_session(url: str = "sqlite://") -> Session:
+    """Create a throwaway database with the current schema"""
+    engine_kwargs = {}
+    if url.startswith("sqlite://"):
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+        if url == "sqlite://":
+            engine_kwargs["poolclass"] = StaticPool
+    engine = create_engine(url, **engine_kwargs)
+    Base.metadata.create_all(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def seed(
+    db: Session,
+    stores: int,
+    riders_per_store: int = 5,
+    external_riders: int = 0,
+    brands: int = 0,
+    externo_riders: int = 0,
+    manual_overrides: int = 0,
+    absence_rate: float = 0.1,
+    start_date: date = date(2026, 1, 5),
+    days: int = 31,
+    seed_value: int = 42,
+) -> None:
+    """Populate the session with a reproducible network of stores and riders"""
+    rng = random.Random(seed_value)
+    db.add_all(
+        [
+            PanpayaStore(code=f"S{i:05d}", name=f"Sucursal {i}", zone=ZONES[i % len(ZONES)])
+            for i in range(stores)
+        ]
+    )
+    db.flush()
+    store_ids = [store_id for (store_id,) in db.query(PanpayaStore.id).all()]
+    riders = []
+    for store_id in store_ids:
+        for _ in range(rng.randint(max(1, riders_per_store - 2), riders_per_store + 2)):
+            riders.append(
+                Rider(
+                    full_name=f"Rider {len(riders)}",
+                    rider_type="PANPAYA",
+                    active=rng.random() > 0.05,
+                    store_id=store_id,
+                    observation=rng.choice(OBSERVATIONS),
+                )
+            )
+    for index in range(external_riders):
+        riders.append(
+            Rider(
+                full_name=f"Rider {len(riders)}",
+                rider_type="TC" if index % 3 else "FDS",
+                active=True,
+                observation=rng.choice(OBSERVATIONS),
+            )
+        )
+    for _ in range(externo_riders):
+        riders.append(
+            Rider(
+                full_name=f"Rider {len(riders)}",
+                rider_type="EXTERNO",
+                active=True,
+                observation=rng.choice(OBSERVATIONS),
+            )
+        )
+    db.add_all(riders)
+    db.add_all([ExternalBrand(name=f"Marca {i:04d}") for i in range(brands)])
+    db.flush()
+    rider_ids = [rider_id for (rider_id,) in db.query(Rider.id).all()]
+    absences = []
+    for rider in riders:
+        reason = observation_reason(rider.observation)
+        if reason:
+            absences.append(
+                RiderAbsence(
+                    rider_id=rider.id,
+                    reason=reason,
+                    notes=rider.observation,
+                    source="OBSERVATION",
+                )
+            )
+        elif rng.random() < absence_rate:
+            first = start_date + timedelta(days=rng.randrange(-3, days))
+            absences.append(
+                RiderAbsence(
+                    rider_id=rider.id,
+                    start_date=first,
+                    end_date=first + timedelta(days=rng.randrange(10)),
+                    reason="PERMISO",
+                )
+            )
+    db.add_all(absences)
+    db.add_all(
+        [
+            ScheduleAssignment(
+                rider_id=rng.choice(rider_ids),
+                shift_date=start_date + timedelta(days=rng.randrange(days)),
+                shift_type="AM",
+                manual_override=True,
+            )
+            for _ in range(manual_overrides)
+        ]
+    )
+    db.commit()